@@ -1,10 +1,21 @@
 
 
+import argparse
+import contextlib
+import itertools
+import json
 import math
+import inspect
+import os
+import resource
+import time
+import numpy as np
 import torch
+import torch.nn as nn
 import torch.nn.functional as F
-from typing import List, Tuple, Dict
-from collections import namedtuple
+from typing import List, Tuple, Dict, Optional, Union
+from collections import Counter, namedtuple
+from collections.abc import Mapping
 from sacrebleu import corpus_bleu  # pip install sacrebleu
 
 
@@ -16,18 +27,512 @@ EOS_TOKEN = "<eos>"
 PAD_TOKEN = "<pad>"
 
 
+UNK_TOKEN = "<unk>"
+
+
+class _StoiView(Mapping):
+    """Read-only token -> id mapping over a Vocab's arrays (no dict is built)."""
+    def __init__(self, vocab: "Vocab"):
+        self._vocab = vocab
+    def __getitem__(self, token: str) -> int:
+        idx = self._vocab.lookup(token)
+        if idx is None:
+            raise KeyError(token)
+        return idx
+    def __iter__(self):
+        return (self._vocab.token(i) for i in range(len(self._vocab)))
+    def __len__(self) -> int:
+        return len(self._vocab)
+
+
+class _ItosView(Mapping):
+    """Read-only id -> token mapping over a Vocab's arrays."""
+    def __init__(self, vocab: "Vocab"):
+        self._vocab = vocab
+    def __getitem__(self, idx: int) -> str:
+        if not 0 <= idx < len(self._vocab):
+            raise KeyError(idx)
+        return self._vocab.token(idx)
+    def __iter__(self):
+        return iter(range(len(self._vocab)))
+    def __len__(self) -> int:
+        return len(self._vocab)
+
+
 class Vocab:
+    """
+    Token <-> id mapping kept in four flat NumPy arrays instead of Python dicts:
+
+    buffer      uint8     UTF-8 bytes of every token, concatenated in id order
+    offsets     int64     (n + 1,) token i is buffer[offsets[i]:offsets[i + 1]]
+    sorted_keys S<width>  tokens sorted bytewise, for np.searchsorted lookups
+    sorted_ids  int32     id of each entry of sorted_keys
+
+    save() writes them as .npy files in a directory and load() memory-maps them, so
+    startup does not rebuild any dict. stoi / itos are read-only views over the arrays.
+    """
+    ARRAYS = ("buffer", "offsets", "sorted_keys", "sorted_ids")
+
     def __init__(self, stoi: Dict[str,int], itos: Dict[int,str]):
-        self.stoi = stoi
-        self.itos = itos
+        self._set_arrays(*self._build_arrays([itos[i] for i in range(len(itos))], stoi))
+
+    @classmethod
+    def from_tokens(cls, tokens: List[str]) -> "Vocab":
+        vocab = cls.__new__(cls)
+        vocab._set_arrays(*cls._build_arrays(list(tokens)))
+        return vocab
+
+    @staticmethod
+    def _build_arrays(tokens: List[str], stoi: Optional[Dict[str,int]] = None):
+        """tokens gives id -> string; stoi, if given, gives the string -> id side (it may hold aliases)."""
+        encoded = [t.encode("utf-8") for t in tokens]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8).copy()
+        if stoi is None:
+            keys, ids = encoded, np.arange(len(encoded), dtype=np.int32)
+        else:
+            keys = [t.encode("utf-8") for t in stoi]
+            ids = np.fromiter(stoi.values(), dtype=np.int32, count=len(stoi))
+        width = max((len(b) for b in keys), default=1) or 1
+        keys = np.array(keys, dtype=f"S{width}")
+        order = np.argsort(keys, kind="stable")
+        return buffer, offsets, keys[order], ids[order]
+
+    def _set_arrays(self, buffer, offsets, sorted_keys, sorted_ids):
+        self.buffer = buffer
+        self.offsets = offsets
+        self.sorted_keys = sorted_keys
+        self.sorted_ids = sorted_ids
+        self._width = sorted_keys.dtype.itemsize
+        self._strings = None
+        self._string_list = None
+        self.stoi = _StoiView(self)
+        self.itos = _ItosView(self)
+        self.unk_id = self.lookup(UNK_TOKEN)
+        if self.unk_id is None:
+            self.unk_id = 0
+        self.pad_id = self.lookup(PAD_TOKEN)
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), np.asarray(getattr(self, name)))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "Vocab":
+        mode = "r" if mmap else None
+        vocab = cls.__new__(cls)
+        vocab._set_arrays(*(np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode) for name in cls.ARRAYS))
+        return vocab
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def token(self, idx: int) -> str:
+        return bytes(self.buffer[self.offsets[idx]:self.offsets[idx + 1]]).decode("utf-8")
+
+    def strings(self) -> np.ndarray:
+        """Every token as a str (object array), decoded from the buffer on first use and kept."""
+        if self._strings is None:
+            buffer = self.buffer.tobytes()
+            offsets = self.offsets.tolist()
+            self._strings = np.array([buffer[a:b].decode("utf-8") for a, b in zip(offsets, offsets[1:])],
+                                     dtype=object)
+        return self._strings
+
+    def _gather(self, ids: np.ndarray) -> np.ndarray:
+        """Tokens for an int array of ids; out-of-range ids raise KeyError like the itos view."""
+        if ids.size and (ids.min() < 0 or ids.max() >= len(self)):
+            bad = ids[(ids < 0) | (ids >= len(self))]
+            raise KeyError(int(bad[0]))
+        return self.strings()[ids]
+
+    def lookup(self, token: str):
+        """Id of token, or None if it is not in the vocabulary."""
+        key = token.encode("utf-8")
+        if len(key) > self._width:
+            return None
+        pos = int(np.searchsorted(self.sorted_keys, key))
+        if pos < len(self.sorted_keys) and self.sorted_keys[pos] == key:
+            return int(self.sorted_ids[pos])
+        return None
+
+    def _encode_flat(self, tokens: List[str]) -> np.ndarray:
+        if not tokens:
+            return np.zeros(0, dtype=np.int64)
+        encoded = [t.encode("utf-8") for t in tokens]
+        # a fixed-width array truncates longer keys, which could then match a shorter token
+        too_long = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)) > self._width
+        keys = np.array(encoded, dtype=self.sorted_keys.dtype)
+        pos = np.minimum(np.searchsorted(self.sorted_keys, keys), len(self.sorted_keys) - 1)
+        found = (self.sorted_keys[pos] == keys) & ~too_long
+        return np.where(found, self.sorted_ids[pos], self.unk_id).astype(np.int64)
+
     def encode(self, tokens: List[str]) -> List[int]:
-        return [self.stoi.get(t, self.stoi.get("<unk>", 0)) for t in tokens]
+        return self._encode_flat(tokens).tolist()
+
     def decode(self, ids: List[int]) -> List[str]:
-        return [self.itos[i] for i in ids]
+        if isinstance(ids, (np.ndarray, torch.Tensor)):
+            ids = ids.tolist()
+        if ids and (min(ids) < 0 or max(ids) >= len(self)):
+            raise KeyError(next(i for i in ids if not 0 <= i < len(self)))
+        if self._string_list is None:
+            self._string_list = self.strings().tolist()
+        tokens = self._string_list
+        return [tokens[i] for i in ids]
+
+    def encode_batch(self, sentences: List[List[str]]) -> Tuple[torch.LongTensor, torch.LongTensor]:
+        """Encode many token lists with one vectorized lookup. Returns (padded (batch, max_len), lengths)."""
+        lengths = np.array([len(s) for s in sentences], dtype=np.int64)
+        ids = self._encode_flat([t for s in sentences for t in s])
+        pad_id = self.pad_id if self.pad_id is not None else 0
+        padded = np.full((len(sentences), int(lengths.max(initial=0))), pad_id, dtype=np.int64)
+        padded[np.arange(padded.shape[1]) < lengths[:, None]] = ids
+        return torch.from_numpy(padded), torch.from_numpy(lengths)
+
+    def decode_batch(self, ids, lengths=None) -> List[List[str]]:
+        """Decode a (batch, len) id array / tensor, or a list of id lists, with one gather."""
+        if isinstance(ids, list) and lengths is None:
+            lengths = np.array([len(row) for row in ids], dtype=np.int64)
+            flat = np.fromiter(itertools.chain.from_iterable(ids), dtype=np.int64, count=int(lengths.sum()))
+        else:
+            ids = ids.cpu().numpy() if isinstance(ids, torch.Tensor) else np.asarray(ids)
+            if lengths is None:
+                lengths = np.full(ids.shape[0], ids.shape[1] if ids.ndim == 2 else 0)
+            lengths = np.asarray(lengths.cpu() if isinstance(lengths, torch.Tensor) else lengths)
+            flat = ids[np.arange(ids.shape[1]) < lengths[:, None]] if ids.size else ids.reshape(-1)
+        strings = self._gather(flat)
+        bounds = np.concatenate([[0], np.cumsum(lengths)])
+        return [strings[bounds[i]:bounds[i + 1]].tolist() for i in range(len(lengths))]
+
+
+def vocab_from_itos(itos: List[str]) -> Vocab:
+    return Vocab.from_tokens(itos)
+
+
+def _embedding(vocab_size: int, emb_dim: int, pad_id: int) -> nn.Embedding:
+    if torch.get_default_device().type == "meta":
+        # normal_ on a meta tensor imports torch._dynamo (~2s); the weight is about to be assigned anyway
+        return nn.Embedding(vocab_size, emb_dim, padding_idx=pad_id, _weight=torch.empty(vocab_size, emb_dim))
+    return nn.Embedding(vocab_size, emb_dim, padding_idx=pad_id)
+
+
+class Encoder(nn.Module):
+    """Embedding + LSTM encoder. forward(src (batch, src_len), src_len (batch,)) -> (outputs, (h, c))."""
+    def __init__(self, vocab_size: int, emb_dim: int, hid_dim: int, num_layers: int = 1, pad_id: int = 0):
+        super().__init__()
+        self.embedding = _embedding(vocab_size, emb_dim, pad_id)
+        self.rnn = nn.LSTM(emb_dim, hid_dim, num_layers=num_layers, batch_first=True)
+
+    def forward(self, src, src_len):
+        packed = nn.utils.rnn.pack_padded_sequence(self.embedding(src), src_len.cpu(),
+                                                   batch_first=True, enforce_sorted=False)
+        outputs, hidden = self.rnn(packed)
+        outputs, _ = nn.utils.rnn.pad_packed_sequence(outputs, batch_first=True, total_length=src.size(1))
+        return outputs, hidden
+
+
+class AttentionDecoder(nn.Module):
+    """LSTM decoder with dot-product attention over the encoder outputs, driven one token at a time."""
+    def __init__(self, vocab_size: int, emb_dim: int, hid_dim: int, num_layers: int = 1, pad_id: int = 0):
+        super().__init__()
+        self.embedding = _embedding(vocab_size, emb_dim, pad_id)
+        self.rnn = nn.LSTM(emb_dim + hid_dim, hid_dim, num_layers=num_layers)
+        self.out = nn.Linear(hid_dim, vocab_size)
+
+    def step(self, input_token, hidden, encoder_outputs, src_mask=None, output_ids=None):
+        """
+        input_token (batch,), hidden (h, c), encoder_outputs (batch, src_len, hid) -> (logits, hidden, attn).
+        With output_ids (a vocabulary shortlist) only those rows of the output projection are
+        computed and logits is (batch, len(output_ids)).
+        """
+        query = hidden[0][-1].unsqueeze(2)
+        scores = torch.bmm(encoder_outputs, query).squeeze(2)
+        if src_mask is not None:
+            scores = scores.masked_fill(~src_mask, float("-inf"))
+        attn = torch.softmax(scores, dim=-1)
+        context = torch.bmm(attn.unsqueeze(1), encoder_outputs).squeeze(1)
+        rnn_input = torch.cat([self.embedding(input_token), context], dim=-1).unsqueeze(0)
+        output, hidden = self.rnn(rnn_input, hidden)
+        output = output.squeeze(0)
+        if output_ids is None:
+            return self.out(output), hidden, attn
+        if isinstance(self.out, nn.Linear):
+            return F.linear(output, self.out.weight.index_select(0, output_ids),
+                            self.out.bias.index_select(0, output_ids)), hidden, attn
+        # quantized projection: no fp32 weight to slice
+        return self.out(output).index_select(1, output_ids), hidden, attn
 
 
 BeamHypothesis = namedtuple("BeamHypothesis", ["tokens", "log_prob", "state", "attn_weights"])
 
+# Batch dimension of encoder_outputs (batch-first) and of the recurrent state
+# ((num_layers, batch, hidden) as returned by nn.LSTM / nn.GRU).
+ENC_BATCH_DIM = 0
+STATE_BATCH_DIM = 1
+
+
+def _select_state(state, index: torch.LongTensor):
+    """Reorder a (possibly nested tuple) recurrent state along its batch dim."""
+    if state is None:
+        return None
+    if isinstance(state, torch.Tensor):
+        return state.index_select(STATE_BATCH_DIM, index)
+    return type(state)(_select_state(s, index) for s in state)
+
+
+def _length_penalty(length: int, alpha: float) -> float:
+    return ((5.0 + length) / 6.0) ** alpha if alpha > 0 else 1.0
+
+
+def _decoder_accepts(decoder, name: str) -> bool:
+    """Whether decoder.step takes the keyword name (src_mask: padding mask, output_ids: shortlist)."""
+    try:
+        return name in inspect.signature(decoder.step).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def _hyp_score(hyp: BeamHypothesis, length_penalty_alpha: float) -> float:
+    return hyp.log_prob / _length_penalty(len(hyp.tokens), length_penalty_alpha)
+
+
+def _finalize_hyps(hyps: List[BeamHypothesis], vocab: Vocab, sos_id: int, eos_id: int,
+                   length_penalty_alpha: float, n_best: int, return_attn: bool = False):
+    hyps = sorted(hyps, key=lambda h: _hyp_score(h, length_penalty_alpha), reverse=True)
+    token_lists = []
+    for hyp in hyps[:n_best]:
+        tokens = hyp.tokens
+        if tokens and tokens[0] == sos_id:
+            tokens = tokens[1:]
+        if eos_id in tokens:
+            tokens = tokens[:tokens.index(eos_id)]
+        token_lists.append(tokens)
+    decoded_sentences = []
+    for hyp, tokens, decoded_tokens in zip(hyps, token_lists, vocab.decode_batch(token_lists)):
+        if return_attn:
+            decoded_sentences.append((decoded_tokens, hyp.log_prob, hyp.attn_weights[:len(tokens)]))
+        else:
+            decoded_sentences.append((decoded_tokens, hyp.log_prob))
+    return decoded_sentences
+
+
+def _backtrack(tok_hist, ptr_hist, step: int, slot: int, sos_id: int) -> List[int]:
+    """Rebuild a hypothesis from the back-pointer arrays, ending at (step, slot)."""
+    tokens = []
+    for t in range(step, -1, -1):
+        tokens.append(tok_hist[t][slot])
+        slot = ptr_hist[t][slot]
+    tokens.append(sos_id)
+    tokens.reverse()
+    return tokens
+
+
+def batch_beam_search_decode(encoder, decoder, src_batch: torch.LongTensor, src_lens: torch.LongTensor,
+                             vocab: Vocab,
+                             beam_size: int = 5,
+                             max_len: int = 100,
+                             length_penalty_alpha: float = 0.0,
+                             n_best: int = 1,
+                             early_stopping: Union[bool, str] = "bound",
+                             return_attn: bool = False,
+                             max_len_ratio: float = None,
+                             max_len_offset: int = 10,
+                             stats: Dict[str, int] = None,
+                             output_ids: torch.LongTensor = None):
+    """
+    Beam search over a batch of padded source sentences with a single encoder call.
+
+    src_batch: (batch, src_len) LongTensor padded with PAD_TOKEN
+    src_lens: (batch,) lengths
+    Each sentence owns beam_size rows of the decoder batch. Finished beams are masked
+    to -inf, and sentences that are done are compacted out of the batch so later steps
+    only pay for the sentences still decoding. If decoder.step accepts a src_mask
+    keyword it is given a (rows, src_len) bool mask of the non-pad positions.
+
+    Hypotheses are not copied per candidate: every row has a fixed slot in preallocated
+    (max_len, batch * beam_size) token / back-pointer / score arrays, and the finished
+    sequences are rebuilt from them once at the end. With return_attn=True the attention
+    of the selected beams is kept too (max_len * batch * beam_size * src_len floats).
+
+    early_stopping: "bound" ends a sentence once no live beam can beat its n_best-th
+        finished hypothesis under the length penalty. Log-probs only fall, so a live
+        beam can at best reach log_prob / lp(longest allowed length). True ends it as
+        soon as n_best hypotheses have finished (cheaper but may miss better ones);
+        False decodes until max_len.
+    max_len_ratio: cap sentence i at min(max_len, ceil(max_len_ratio * src_len_i) + max_len_offset)
+        steps instead of a fixed max_len.
+    stats: optional dict; "decoder_steps" (batched step calls) and "sentence_steps" (steps
+        summed over sentences) are added to it.
+    output_ids: restrict the search to these target ids (a Shortlist); must contain EOS.
+        Decoders whose step() takes output_ids only project onto them; for others the
+        full logits are sliced, which still shrinks the softmax and topk.
+    Returns: one beam_search_decode-style list of (tokens, log_prob) per sentence, in input
+    order; (tokens, log_prob, attn) with attn (len(tokens), src_len) when return_attn is set.
+    """
+    sos_id = vocab.stoi[SOS_TOKEN]
+    eos_id = vocab.stoi[EOS_TOKEN]
+
+    encoder.eval(); decoder.eval()
+    with torch.no_grad():
+        src_batch = src_batch.to(DEVICE)
+        src_lens = torch.as_tensor(src_lens).view(-1)
+        batch_size = src_batch.size(0)
+        n_slots = batch_size * beam_size
+        encoder_outputs, encoder_hidden = encoder(src_batch, src_lens.to(DEVICE))
+
+        row_sent = torch.arange(batch_size, device=DEVICE).repeat_interleave(beam_size)
+        encoder_outputs = encoder_outputs.index_select(ENC_BATCH_DIM, row_sent)
+        state = _select_state(encoder_hidden, row_sent)
+        if output_ids is not None:
+            output_ids = torch.as_tensor(output_ids, dtype=torch.long).to(DEVICE)
+            project_shortlist = _decoder_accepts(decoder, "output_ids")
+        src_mask = None
+        if _decoder_accepts(decoder, "src_mask"):
+            positions = torch.arange(src_batch.size(1), device=DEVICE)
+            src_mask = (positions.unsqueeze(0) < src_lens.to(DEVICE).unsqueeze(1)).index_select(0, row_sent)
+
+        limits = [max_len] * batch_size
+        if max_len_ratio is not None:
+            limits = [min(max_len, int(math.ceil(max_len_ratio * n)) + max_len_offset) for n in src_lens.tolist()]
+        hist_len = max(limits, default=0)
+
+        tok_hist = torch.empty((hist_len, n_slots), dtype=torch.long, device=DEVICE)
+        ptr_hist = torch.empty((hist_len, n_slots), dtype=torch.long, device=DEVICE)
+        score_hist = torch.empty((hist_len, n_slots), device=DEVICE)
+        attn_hist = None
+        if return_attn:
+            attn_hist = torch.zeros((hist_len, n_slots, src_batch.size(1)), device=DEVICE)
+
+        # every sentence starts with a single live beam; the other rows are dead (-inf)
+        last_tokens = torch.full((n_slots,), sos_id, dtype=torch.long, device=DEVICE)
+        log_probs = torch.full((batch_size, beam_size), float("-inf"), device=DEVICE)
+        log_probs[:, 0] = 0.0
+        log_probs = log_probs.view(-1)
+        row_slot = torch.arange(n_slots, device=DEVICE)  # history column of each live row
+
+        active = list(range(batch_size))  # original sentence index of each active block
+        finished_at: List[List[Tuple[int, int]]] = [[] for _ in range(batch_size)]  # (step, slot)
+        finished_scores: List[List[float]] = [[] for _ in range(batch_size)]  # length-penalised
+        steps_run = sentence_steps = 0
+
+        for step in range(hist_len):
+            n_active = len(active)
+            if n_active == 0:
+                break
+            steps_run = step + 1
+            sentence_steps += n_active
+
+            step_kwargs = {"src_mask": src_mask} if src_mask is not None else {}
+            if output_ids is not None and project_shortlist:
+                step_kwargs["output_ids"] = output_ids
+            logits, next_state, attn = decoder.step(last_tokens, state, encoder_outputs, **step_kwargs)
+            if output_ids is not None and not project_shortlist:
+                logits = logits.view(n_active * beam_size, -1).index_select(1, output_ids)
+            step_log_probs = F.log_softmax(logits.view(n_active * beam_size, -1), dim=-1)
+            vocab_size = step_log_probs.size(1)
+
+            # all live beams of a sentence share the same length, so ranking by the
+            # summed log-prob is the same as ranking by the length-penalised score
+            cand_scores = (log_probs.unsqueeze(1) + step_log_probs).view(n_active, -1)
+            top_scores, top_ids = torch.topk(cand_scores, beam_size, dim=1)
+            block_offset = torch.arange(n_active, device=DEVICE).unsqueeze(1) * beam_size
+            row_idx = (torch.div(top_ids, vocab_size, rounding_mode="floor") + block_offset).view(-1)
+            last_tokens = (top_ids % vocab_size).view(-1)
+            if output_ids is not None:
+                last_tokens = output_ids.index_select(0, last_tokens)
+            log_probs = top_scores.view(-1)
+            state = _select_state(next_state, row_idx)
+
+            tok_hist[step, row_slot] = last_tokens
+            ptr_hist[step, row_slot] = row_slot.index_select(0, row_idx)
+            score_hist[step, row_slot] = log_probs
+            if attn_hist is not None and attn is not None:
+                step_attn = attn.view(n_active * beam_size, -1).index_select(0, row_idx)
+                attn_hist[step, row_slot, :step_attn.size(1)] = step_attn
+
+            valid = torch.isfinite(log_probs)
+            finished = valid & (last_tokens == eos_id)
+            alive = valid & ~finished
+            # single host sync per step
+            finished_flags, alive_flags, scores = torch.stack(
+                [finished.to(log_probs.dtype), alive.to(log_probs.dtype), log_probs]).tolist()
+            finished_rows = [r for r, f in enumerate(finished_flags) if f]
+            slots = None
+
+            if finished_rows:
+                slots = row_slot.tolist()
+                penalty = _length_penalty(step + 2, length_penalty_alpha)
+                for r in finished_rows:
+                    sent = active[r // beam_size]
+                    finished_at[sent].append((step, slots[r]))
+                    finished_scores[sent].append(scores[r] / penalty)
+                log_probs = log_probs.masked_fill(finished, float("-inf"))
+
+            keep_blocks = []
+            for b, sent in enumerate(active):
+                live = [r for r in range(b * beam_size, (b + 1) * beam_size) if alive_flags[r]]
+                if not live:
+                    continue
+                if step + 1 >= limits[sent]:
+                    # out of steps: without a finished hypothesis, keep the live beams
+                    if not finished_at[sent]:
+                        slots = slots if slots is not None else row_slot.tolist()
+                        finished_at[sent].extend((step, slots[r]) for r in live)
+                    continue
+                if early_stopping == "bound":
+                    if len(finished_scores[sent]) >= n_best:
+                        nth_best = sorted(finished_scores[sent], reverse=True)[n_best - 1]
+                        best_live = max(scores[r] for r in live)
+                        if best_live / _length_penalty(limits[sent] + 1, length_penalty_alpha) <= nth_best:
+                            continue
+                elif early_stopping and len(finished_at[sent]) >= n_best:
+                    continue
+                keep_blocks.append(b)
+
+            if len(keep_blocks) < n_active:
+                keep_rows = torch.tensor([b * beam_size + k for b in keep_blocks for k in range(beam_size)],
+                                         dtype=torch.long, device=DEVICE)
+                last_tokens = last_tokens.index_select(0, keep_rows)
+                log_probs = log_probs.index_select(0, keep_rows)
+                row_slot = row_slot.index_select(0, keep_rows)
+                state = _select_state(state, keep_rows)
+                encoder_outputs = encoder_outputs.index_select(ENC_BATCH_DIM, keep_rows)
+                if src_mask is not None:
+                    src_mask = src_mask.index_select(0, keep_rows)
+                active = [active[b] for b in keep_blocks]
+
+        if stats is not None:
+            stats["decoder_steps"] = stats.get("decoder_steps", 0) + steps_run
+            stats["sentence_steps"] = stats.get("sentence_steps", 0) + sentence_steps
+
+        # one device -> host copy of the history, then rebuild the sequences
+        tok_hist = tok_hist[:steps_run].tolist()
+        ptr_hist = ptr_hist[:steps_run].tolist()
+        score_hist = score_hist[:steps_run].tolist()
+        if attn_hist is not None:
+            attn_hist = attn_hist[:steps_run].cpu()
+
+        results = []
+        for sent, ends in enumerate(finished_at):
+            hyps = []
+            for step, slot in ends:
+                attn_weights = []
+                if attn_hist is not None:
+                    attn_slots = [slot]
+                    for t in range(step, 0, -1):
+                        attn_slots.append(ptr_hist[t][attn_slots[-1]])
+                    attn_slots.reverse()
+                    attn_weights = attn_hist[torch.arange(step + 1), torch.tensor(attn_slots),
+                                             :int(src_lens[sent])]
+                hyps.append(BeamHypothesis(tokens=_backtrack(tok_hist, ptr_hist, step, slot, sos_id),
+                                           log_prob=score_hist[step][slot], state=None,
+                                           attn_weights=attn_weights))
+            results.append(_finalize_hyps(hyps, vocab, sos_id, eos_id, length_penalty_alpha, n_best,
+                                          return_attn=return_attn))
+        return results
+
 
 def beam_search_decode(encoder, decoder, src_tensor: torch.LongTensor, src_len: torch.LongTensor,
                        vocab: Vocab,
@@ -35,95 +540,304 @@ def beam_search_decode(encoder, decoder, src_tensor: torch.LongTensor, src_len:
                        max_len: int = 100,
                        length_penalty_alpha: float = 0.0,
                        n_best: int = 1,
-                       early_stopping: bool = True):
+                       early_stopping: Union[bool, str] = "bound",
+                       return_attn: bool = False,
+                       max_len_ratio: float = None,
+                       max_len_offset: int = 10):
     """
     encoder: encoder module, returns encoder_outputs, hidden (and optionally cell)
     decoder: decoder module with a method .step(input_token, hidden, encoder_outputs) -> (logits, next_hidden, attn)
              or you can adapt below to your decoder signature.
+             step() is called once per time step with all live beams stacked along the batch dim:
+             input_token (beam,), hidden batched on STATE_BATCH_DIM, encoder_outputs on ENC_BATCH_DIM.
     src_tensor: (src_len,) or (1, src_len) LongTensor (already token-ids)
     src_len: scalar length tensor or int
     vocab: Vocab instance with stoi/itos
+    return_attn: also return the (len, src_len) attention of each hypothesis
+    early_stopping / max_len_ratio / max_len_offset: see batch_beam_search_decode
     Returns: list of best decoded token lists (n_best)
     """
-    sos_id = vocab.stoi[SOS_TOKEN]
-    eos_id = vocab.stoi[EOS_TOKEN]
+    return batch_beam_search_decode(encoder, decoder, src_tensor.view(1, -1), torch.as_tensor(src_len).view(1),
+                                    vocab, beam_size=beam_size, max_len=max_len,
+                                    length_penalty_alpha=length_penalty_alpha, n_best=n_best,
+                                    early_stopping=early_stopping, return_attn=return_attn,
+                                    max_len_ratio=max_len_ratio, max_len_offset=max_len_offset)[0]
+
+
+def translate_corpus(encoder, decoder, sources: List[List[int]], vocab: Vocab,
+                     batch_size: int = 32, shortlist: "Shortlist" = None, **decode_kwargs):
+    """
+    Decode many token-id sentences with batch_beam_search_decode.
+
+    Sentences are sorted by length and cut into buckets of batch_size, so each
+    batch pads to a similar length (and is in descending length order, as
+    pack_padded_sequence expects). decode_kwargs are passed through
+    (beam_size, max_len, length_penalty_alpha, n_best, early_stopping, return_attn,
+    max_len_ratio, max_len_offset, stats). With a Shortlist, each batch is decoded over
+    the union of its sentences' candidate target sets.
+    Returns: results in the same order as sources.
+    """
     pad_id = vocab.stoi[PAD_TOKEN]
+    order = sorted(range(len(sources)), key=lambda i: len(sources[i]), reverse=True)
+    results = [None] * len(sources)
+    for start in range(0, len(order), batch_size):
+        bucket = order[start:start + batch_size]
+        lens = [len(sources[i]) for i in bucket]
+        src_batch = torch.full((len(bucket), max(lens)), pad_id, dtype=torch.long)
+        for row, i in enumerate(bucket):
+            src_batch[row, :lens[row]] = torch.as_tensor(sources[i], dtype=torch.long)
+        if shortlist is not None:
+            decode_kwargs["output_ids"] = shortlist.ids_for([sources[i] for i in bucket])
+        decoded = batch_beam_search_decode(encoder, decoder, src_batch, torch.tensor(lens), vocab,
+                                           **decode_kwargs)
+        for i, result in zip(bucket, decoded):
+            results[i] = result
+    return results
 
-    # ---- run encoder ----
-    encoder.eval(); decoder.eval()
-    with torch.no_grad():
-       
-        encoder_outputs, encoder_hidden = encoder(src_tensor.unsqueeze(0).to(DEVICE), src_len.to(DEVICE))
-        
-        initial_state = encoder_hidden 
-        beams = [BeamHypothesis(tokens=[sos_id], log_prob=0.0, state=initial_state, attn_weights=[])]
 
-        completed_hyps: List[BeamHypothesis] = []
+def build_lexical_table(src_path: str, tgt_path: str, out_path: str, top_k: int = 50,
+                        n_frequent: int = 2000, max_lines: int = None):
+    """
+    Build a lexical translation table for Shortlist from a whitespace-tokenized parallel corpus.
 
-        for step in range(max_len):
-            all_candidates: List[BeamHypothesis] = []
+    Source/target words that co-occur in a sentence pair are counted once per pair and
+    ranked by the Dice coefficient 2 c(s, t) / (c(s) + c(t)); the top_k targets of each
+    source word are kept, together with the n_frequent most frequent target words.
+    Written as JSON: {"frequent": [...], "table": {src: [[tgt, dice], ...]}}.
+    """
+    src_count, tgt_count, tgt_freq, pair_count = Counter(), Counter(), Counter(), Counter()
+    with open(src_path, encoding="utf-8") as src_file, open(tgt_path, encoding="utf-8") as tgt_file:
+        for src_line, tgt_line in itertools.islice(zip(src_file, tgt_file), max_lines):
+            src_words, tgt_tokens = set(src_line.split()), tgt_line.split()
+            tgt_words = set(tgt_tokens)
+            tgt_freq.update(tgt_tokens)
+            src_count.update(src_words)
+            tgt_count.update(tgt_words)
+            pair_count.update(itertools.product(src_words, tgt_words))
 
-           
-            if len(beams) == 0:
-                break
+    candidates: Dict[str, List[Tuple[str, float]]] = {}
+    for (src, tgt), n in pair_count.items():
+        candidates.setdefault(src, []).append((tgt, 2.0 * n / (src_count[src] + tgt_count[tgt])))
+    table = {src: [[t, round(d, 4)] for t, d in sorted(cands, key=lambda c: -c[1])[:top_k]]
+             for src, cands in candidates.items()}
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"frequent": [t for t, _ in tgt_freq.most_common(n_frequent)], "table": table},
+                  f, ensure_ascii=False)
 
-            for beam in beams:
-                last_token = beam.tokens[-1]
-                if last_token == eos_id:
-                    completed_hyps.append(beam)
-                    continue
 
-                input_token = torch.LongTensor([last_token]).to(DEVICE) 
-                logits, next_state, attn = decoder.step(input_token, beam.state, encoder_outputs)
-                log_probs = F.log_softmax(logits.squeeze(0), dim=-1) 
+class Shortlist:
+    """
+    Per-sentence candidate target ids for vocabulary-restricted decoding: the top_k
+    lexical translations of every source word, plus the n_frequent most frequent target
+    words and EOS / UNK. Built once per batch, so the per-step output projection,
+    softmax and topk run over a few hundred ids instead of the full vocabulary.
+    """
+    def __init__(self, table: Dict[int, List[int]], base_ids: List[int]):
+        self.table = table
+        self.base_ids = sorted(set(base_ids))
 
-                topk_log_probs, topk_ids = torch.topk(log_probs, beam_size)
+    @classmethod
+    def load(cls, path: str, src_vocab: Vocab, tgt_vocab: Vocab, top_k: int = 10, n_frequent: int = 100):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        table = {}
+        for src, targets in data["table"].items():
+            src_id = src_vocab.lookup(src)
+            if src_id is None:
+                continue
+            ids = [tgt_vocab.lookup(t) for t, _ in targets[:top_k]]
+            table[src_id] = [i for i in ids if i is not None]
+        base = [tgt_vocab.stoi[EOS_TOKEN], tgt_vocab.unk_id]
+        base += [i for i in (tgt_vocab.lookup(t) for t in data["frequent"][:n_frequent]) if i is not None]
+        return cls(table, base)
 
-                for k in range(topk_ids.size(0)):
-                    token_id = int(topk_ids[k].item())
-                    token_logprob = float(topk_log_probs[k].item())
-                    new_tokens = beam.tokens + [token_id]
-                    new_logprob = beam.log_prob + token_logprob
-                    new_attn_weights = beam.attn_weights + [attn.cpu() if attn is not None else None]
-                    new_state = next_state  
-                    candidate = BeamHypothesis(tokens=new_tokens, log_prob=new_logprob, state=new_state, attn_weights=new_attn_weights)
-                    all_candidates.append(candidate)
+    def ids_for(self, sources: List[List[int]]) -> torch.LongTensor:
+        """Sorted union of the candidate ids of the given source sentences."""
+        ids = set(self.base_ids)
+        for src in sources:
+            for word in src:
+                ids.update(self.table.get(word, ()))
+        return torch.tensor(sorted(ids), dtype=torch.long)
 
-            if len(all_candidates) == 0:
-                break
 
-            def score(hyp: BeamHypothesis):
-                lp = ((5.0 + len(hyp.tokens)) / 6.0) ** length_penalty_alpha if length_penalty_alpha > 0 else 1.0
-                return hyp.log_prob / lp
+def save_checkpoint(path: str, encoder, decoder, src_vocab: Vocab, tgt_vocab: Vocab, config: Dict[str, int]):
+    """config holds the Encoder / AttentionDecoder sizes: emb_dim, hid_dim, num_layers."""
+    torch.save({
+        "config": dict(config),
+        "encoder": encoder.state_dict(),
+        "decoder": decoder.state_dict(),
+        "src_itos": [src_vocab.itos[i] for i in range(len(src_vocab.itos))],
+        "tgt_itos": [tgt_vocab.itos[i] for i in range(len(tgt_vocab.itos))],
+    }, path)
 
-            all_candidates.sort(key=score, reverse=True)
-            beams = all_candidates[:beam_size]
 
-            new_beams = []
-            for b in beams:
-                if b.tokens[-1] == eos_id:
-                    completed_hyps.append(b)
-                else:
-                    new_beams.append(b)
-            beams = new_beams
+def load_checkpoint(path: str = CHECKPOINT_PATH, mmap: bool = True, quantize: bool = False):
+    """
+    Returns encoder, decoder, src_vocab, tgt_vocab, in eval mode on DEVICE.
 
-            if early_stopping and len(completed_hyps) >= n_best:
-                break
+    mmap: memory-map the checkpoint and assign the mapped tensors as the parameters
+          instead of copying them in, so worker processes loading the same file share
+          its pages through the page cache. The modules are built on the meta device,
+          so no throwaway parameters are allocated or initialized.
+    quantize: dynamically quantize the Linear and LSTM layers to int8 (CPU only).
+              The int8 weights are private to the process; embeddings stay mapped.
+    """
+    if quantize and DEVICE.type != "cpu":
+        raise ValueError("int8 dynamic quantization is only supported on CPU")
+    ckpt = torch.load(path, map_location="cpu", mmap=mmap, weights_only=True)
+    config = ckpt["config"]
+    src_vocab = vocab_from_itos(ckpt["src_itos"])
+    tgt_vocab = vocab_from_itos(ckpt["tgt_itos"])
+    # with mmap the parameters are replaced by the mapped tensors, so build them on the
+    # meta device: no storage is allocated and no init runs
+    with torch.device("meta") if mmap else contextlib.nullcontext():
+        encoder = Encoder(len(ckpt["src_itos"]), config["emb_dim"], config["hid_dim"], config.get("num_layers", 1),
+                          pad_id=src_vocab.stoi[PAD_TOKEN])
+        decoder = AttentionDecoder(len(ckpt["tgt_itos"]), config["emb_dim"], config["hid_dim"],
+                                   config.get("num_layers", 1), pad_id=tgt_vocab.stoi[PAD_TOKEN])
+    encoder.load_state_dict(ckpt["encoder"], assign=mmap)
+    decoder.load_state_dict(ckpt["decoder"], assign=mmap)
+    encoder, decoder = encoder.to(DEVICE).eval(), decoder.to(DEVICE).eval()
+    if quantize:
+        # inplace: the default deep copy would pull the mapped fp32 weights into private memory
+        for module in (encoder, decoder):
+            torch.ao.quantization.quantize_dynamic(module, {nn.Linear, nn.LSTM}, dtype=torch.qint8, inplace=True)
+    return encoder, decoder, src_vocab, tgt_vocab
 
-        if len(completed_hyps) == 0:
-            completed_hyps = beams
 
-        completed_hyps.sort(key=score, reverse=True)
-        best_hyps = completed_hyps[:n_best]
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))]
+
+
+def evaluate(checkpoint_path: str, src_path: str, ref_path: str,
+             beam_size: int = 5, length_penalty_alpha: float = 0.0, n_best: int = 1,
+             max_len: int = 100, batch_size: int = 1, output_path: str = None,
+             mmap: bool = True, quantize: bool = False, early_stopping: Union[bool, str] = "bound",
+             max_len_ratio: float = None, max_len_offset: int = 10,
+             shortlist_path: str = None, shortlist_top_k: int = 10,
+             shortlist_frequent: int = 100) -> Dict[str, float]:
+    """
+    Decode a whitespace-tokenized parallel test set and report quality and speed.
+
+    The source/reference files are streamed batch_size lines at a time, so the test
+    set is never held in memory. Latency is the wall time of the batch a sentence was
+    decoded in. BLEU is computed on the 1-best; with output_path every n-best
+    hypothesis is written as "index ||| text ||| log_prob". mmap / quantize are
+    passed to load_checkpoint, the stopping / max_len options to the beam search.
+    shortlist_path: a build_lexical_table file; decode over a Shortlist built from it.
+    """
+    load_start = time.perf_counter()
+    encoder, decoder, src_vocab, tgt_vocab = load_checkpoint(checkpoint_path, mmap=mmap, quantize=quantize)
+    load_seconds = time.perf_counter() - load_start
+    shortlist = None
+    if shortlist_path:
+        shortlist = Shortlist.load(shortlist_path, src_vocab, tgt_vocab, top_k=shortlist_top_k,
+                                   n_frequent=shortlist_frequent)
+    hypotheses, references, latencies = [], [], []
+    n_sentences = n_tokens = 0
+    decode_time = 0.0
+    stats: Dict[str, int] = {}
+    out = open(output_path, "w", encoding="utf-8") if output_path else None
+    try:
+        with open(src_path, encoding="utf-8") as src_file, open(ref_path, encoding="utf-8") as ref_file:
+            pairs = zip(src_file, ref_file)
+            while True:
+                chunk = list(itertools.islice(pairs, batch_size))
+                if not chunk:
+                    break
+                sources = [src_vocab.encode(src.split()) or [src_vocab.stoi[PAD_TOKEN]] for src, _ in chunk]
+                start = time.perf_counter()
+                results = translate_corpus(encoder, decoder, sources, tgt_vocab, batch_size=batch_size,
+                                           beam_size=beam_size, max_len=max_len,
+                                           length_penalty_alpha=length_penalty_alpha, n_best=n_best,
+                                           early_stopping=early_stopping, max_len_ratio=max_len_ratio,
+                                           max_len_offset=max_len_offset, stats=stats, shortlist=shortlist)
+                elapsed = time.perf_counter() - start
+                decode_time += elapsed
+                latencies.extend([elapsed] * len(chunk))
+                for (_, ref), nbest in zip(chunk, results):
+                    best_tokens = nbest[0][0] if nbest else []
+                    hypotheses.append(" ".join(best_tokens))
+                    references.append(ref.strip())
+                    n_tokens += len(best_tokens)
+                    if out:
+                        for tokens, log_prob in nbest:
+                            out.write(f"{n_sentences} ||| {' '.join(tokens)} ||| {log_prob:.4f}\n")
+                    n_sentences += 1
+    finally:
+        if out:
+            out.close()
+
+    return {
+        "bleu": corpus_bleu(hypotheses, [references]).score,
+        "load_seconds": load_seconds,
+        "sentences": n_sentences,
+        "sentences_per_sec": n_sentences / decode_time if decode_time else 0.0,
+        "tokens_per_sec": n_tokens / decode_time if decode_time else 0.0,
+        "latency_p50_ms": _percentile(latencies, 50) * 1000,
+        "latency_p95_ms": _percentile(latencies, 95) * 1000,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "avg_steps_per_sentence": stats.get("sentence_steps", 0) / max(n_sentences, 1),
+        "decoder_steps": stats.get("decoder_steps", 0),
+    }
+
+
+# command-line names for batch_beam_search_decode's early_stopping values
+EARLY_STOPPING_RULES = {"bound": "bound", "n_best": True, "never": False}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seq2seq beam search tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ev = commands.add_parser("evaluate", help="corpus BLEU and throughput on a parallel test set")
+    ev.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    ev.add_argument("--src", required=True, help="source file, one tokenized sentence per line")
+    ev.add_argument("--ref", required=True, help="reference file aligned with --src")
+    ev.add_argument("--beam-size", type=int, default=5)
+    ev.add_argument("--length-penalty-alpha", type=float, default=0.0)
+    ev.add_argument("--n-best", type=int, default=1)
+    ev.add_argument("--max-len", type=int, default=100)
+    ev.add_argument("--max-len-ratio", type=float, help="cap output length at ratio * source length + offset")
+    ev.add_argument("--max-len-offset", type=int, default=10)
+    ev.add_argument("--early-stopping", choices=list(EARLY_STOPPING_RULES), default="bound")
+    ev.add_argument("--batch-size", type=int, default=1)
+    ev.add_argument("--output", help="write n-best hypotheses here")
+    ev.add_argument("--int8", action="store_true", help="dynamically quantize Linear/LSTM layers to int8")
+    ev.add_argument("--no-mmap", action="store_true", help="read the checkpoint into memory instead of mapping it")
+    ev.add_argument("--shortlist", help="lexical table from build-shortlist; restrict decoding to it")
+    ev.add_argument("--shortlist-top-k", type=int, default=10)
+    ev.add_argument("--shortlist-frequent", type=int, default=100)
+
+    bs = commands.add_parser("build-shortlist", help="lexical translation table for --shortlist")
+    bs.add_argument("--src", required=True)
+    bs.add_argument("--tgt", required=True)
+    bs.add_argument("--out", required=True)
+    bs.add_argument("--top-k", type=int, default=50)
+    bs.add_argument("--n-frequent", type=int, default=2000)
+    bs.add_argument("--max-lines", type=int)
+
+    args = parser.parse_args()
+    if args.command == "evaluate":
+        report = evaluate(args.checkpoint, args.src, args.ref, beam_size=args.beam_size,
+                          length_penalty_alpha=args.length_penalty_alpha, n_best=args.n_best,
+                          max_len=args.max_len, batch_size=args.batch_size, output_path=args.output,
+                          mmap=not args.no_mmap, quantize=args.int8,
+                          early_stopping=EARLY_STOPPING_RULES[args.early_stopping],
+                          max_len_ratio=args.max_len_ratio, max_len_offset=args.max_len_offset,
+                          shortlist_path=args.shortlist, shortlist_top_k=args.shortlist_top_k,
+                          shortlist_frequent=args.shortlist_frequent)
+        print(f"BLEU = {report['bleu']:.2f} | {report['sentences']} sentences | "
+              f"{report['sentences_per_sec']:.1f} sent/s | {report['tokens_per_sec']:.1f} tok/s | "
+              f"p50 {report['latency_p50_ms']:.1f} ms | p95 {report['latency_p95_ms']:.1f} ms | "
+              f"peak RSS {report['peak_rss_mb']:.0f} MB | {report['avg_steps_per_sentence']:.1f} steps/sent")
+    elif args.command == "build-shortlist":
+        build_lexical_table(args.src, args.tgt, args.out, top_k=args.top_k, n_frequent=args.n_frequent,
+                            max_lines=args.max_lines)
 
-        decoded_sentences = []
-        for hyp in best_hyps:
-            tokens = hyp.tokens
-            if tokens and tokens[0] == sos_id:
-                tokens = tokens[1:]
-            if eos_id in tokens:
-                tokens = tokens[:tokens.index(eos_id)]
-            decoded_tokens = vocab.decode(tokens)
-            decoded_sentences.append((decoded_tokens, hyp.log_prob))
 
-        return decoded_sentences
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: memory and time of beam search hypothesis storage.
+
+Compares the old list-copying search (every candidate builds tokens + [id] and
+attn_weights + [attn.cpu()]) with the back-pointer search in 1.py, at
+max_len=100 and max_len=400. EOS is suppressed so every run decodes the full
+max_len steps. Each measurement runs in a fresh process so peak RSS is not
+shared between runs; the Python heap peak (tracemalloc) shows the per-candidate
+list and tensor-object overhead that RSS hides behind the allocator.
+
+    python bench_beam_search.py [--beam-size 5] [--repeats 3]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import torch
+import torch.nn.functional as F
+
+NMT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.py")
+
+
+def load_nmt():
+    spec = importlib.util.spec_from_file_location("nmt", NMT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def list_copy_beam_search(nmt, encoder, decoder, src_tensor, src_len, vocab, beam_size, max_len):
+    """The pre back-pointer search: one decoder.step per beam, lists copied per candidate."""
+    sos_id = vocab.stoi[nmt.SOS_TOKEN]
+    eos_id = vocab.stoi[nmt.EOS_TOKEN]
+    with torch.no_grad():
+        encoder_outputs, hidden = encoder(src_tensor.unsqueeze(0), src_len.view(1))
+        beams = [nmt.BeamHypothesis([sos_id], 0.0, hidden, [])]
+        completed = []
+        for _ in range(max_len):
+            candidates = []
+            for beam in beams:
+                logits, next_state, attn = decoder.step(torch.LongTensor([beam.tokens[-1]]), beam.state,
+                                                        encoder_outputs)
+                top_lp, top_ids = torch.topk(F.log_softmax(logits.squeeze(0), dim=-1), beam_size)
+                for k in range(top_ids.size(0)):
+                    candidates.append(nmt.BeamHypothesis(beam.tokens + [int(top_ids[k].item())],
+                                                         beam.log_prob + float(top_lp[k].item()),
+                                                         next_state,
+                                                         beam.attn_weights + [attn.cpu()]))
+            candidates.sort(key=lambda h: h.log_prob, reverse=True)
+            beams = [b for b in candidates[:beam_size] if b.tokens[-1] != eos_id]
+            completed += [b for b in candidates[:beam_size] if b.tokens[-1] == eos_id]
+            if not beams:
+                break
+        return completed or beams
+
+
+def build_model(nmt, vocab_size=8000, hid_dim=256):
+    torch.manual_seed(0)
+    stoi = {nmt.PAD_TOKEN: 0, nmt.SOS_TOKEN: 1, nmt.EOS_TOKEN: 2, "<unk>": 3}
+    stoi.update({f"tok{i}": i for i in range(4, vocab_size)})
+    vocab = nmt.Vocab(stoi, {i: s for s, i in stoi.items()})
+    encoder = nmt.Encoder(vocab_size, hid_dim, hid_dim).eval()
+    decoder = nmt.AttentionDecoder(vocab_size, hid_dim, hid_dim).eval()
+    with torch.no_grad():
+        decoder.out.bias[stoi[nmt.EOS_TOKEN]] = -1e4  # always run to max_len
+    return encoder, decoder, vocab
+
+
+def worker(impl, max_len, beam_size, repeats):
+    torch.set_num_threads(1)
+    nmt = load_nmt()
+    encoder, decoder, vocab = build_model(nmt)
+    src = torch.randint(4, 8000, (30,), generator=torch.Generator().manual_seed(1))
+    src_len = torch.tensor(30)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    times = []
+    tracemalloc.start()
+    for _ in range(repeats):
+        start = time.perf_counter()
+        if impl == "list-copy":
+            list_copy_beam_search(nmt, encoder, decoder, src, src_len, vocab, beam_size, max_len)
+        elif impl == "back-pointer":
+            nmt.beam_search_decode(encoder, decoder, src, src_len, vocab, beam_size=beam_size, max_len=max_len)
+        else:
+            nmt.beam_search_decode(encoder, decoder, src, src_len, vocab, beam_size=beam_size, max_len=max_len,
+                                   return_attn=True)
+        times.append(time.perf_counter() - start)
+    heap_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": min(times), "peak_rss_growth_kb": rss_after - rss_before,
+                      "python_heap_peak_kb": heap_peak / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--worker", nargs=2, metavar=("IMPL", "MAX_LEN"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker[0], int(args.worker[1]), args.beam_size, args.repeats)
+        return
+
+    print(f"{'max_len':>7} {'impl':>18} {'time (s)':>10} {'peak RSS growth (MB)':>21} {'Python heap peak (MB)':>22}")
+    for max_len in (100, 400):
+        for impl in ("list-copy", "back-pointer", "back-pointer+attn"):
+            out = subprocess.run([sys.executable, __file__, "--worker", impl, str(max_len),
+                                  "--beam-size", str(args.beam_size), "--repeats", str(args.repeats)],
+                                 check=True, capture_output=True, text=True).stdout
+            result = json.loads(out)
+            print(f"{max_len:>7} {impl:>18} {result['seconds']:>10.3f} {result['peak_rss_growth_kb'] / 1024:>21.1f} "
+                  f"{result['python_heap_peak_kb'] / 1024:>22.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: per-word vs batched MarianMT generation in the dual translator.
+
+Translates 10, 100 and 1000 long words (sampled with repeats, like real text)
+with the old one-generate-per-word loop and with translate_words, for each
+model, and reports the latency of both.
+
+    python bench_dual_translation.py [--sizes 10 100 1000] [--max-batch-size 32]
+"""
+import argparse
+import random
+import time
+
+import torch
+from transformers import MarianMTModel, MarianTokenizer
+
+from sample_words import LONG_WORDS
+from translation_engine import MAX_BATCH_SIZE, translate_words
+
+MODELS = {'French': 'Helsinki-NLP/opus-mt-en-fr', 'Hindi': 'Helsinki-NLP/opus-mt-en-hi'}
+
+
+def per_word(tokenizer, model, words):
+    """The previous translate_text loop: one tokenizer call and one generate per word."""
+    out = []
+    for word in words:
+        inputs = tokenizer(word, return_tensors="pt", padding=True)
+        with torch.no_grad():
+            outputs = model.generate(**inputs, max_length=50)
+        out.append(tokenizer.decode(outputs[0], skip_special_tokens=True))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--skip-per-word-above", type=int, default=1000,
+                        help="don't time the per-word loop for larger inputs")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'lang':>7} {'words':>6} {'per-word (s)':>13} {'batched (s)':>12} {'speedup':>8}")
+    for lang, name in MODELS.items():
+        tokenizer = MarianTokenizer.from_pretrained(name)
+        model = MarianMTModel.from_pretrained(name).eval()
+        for size in args.sizes:
+            words = [rng.choice(LONG_WORDS) for _ in range(size)]
+            start = time.perf_counter()
+            translate_words(tokenizer, model, words, args.max_batch_size)
+            batched = time.perf_counter() - start
+            if size <= args.skip_per_word_above:
+                start = time.perf_counter()
+                per_word(tokenizer, model, words)
+                baseline = time.perf_counter() - start
+                print(f"{lang:>7} {size:>6} {baseline:>13.2f} {batched:>12.2f} {baseline / batched:>7.1f}x")
+            else:
+                print(f"{lang:>7} {size:>6} {'-':>13} {batched:>12.2f} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
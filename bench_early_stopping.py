@@ -0,0 +1,59 @@
+"""
+Benchmark: decoder steps saved by bound-based early stopping and src_len-aware max_len.
+
+Runs `1.py evaluate` on the bundled toy test set with each stopping rule
+(never / n_best / bound), with a fixed max_len and with max_len derived from
+the source length, and reports average decoder steps per sentence, BLEU and
+sentences/sec.
+
+    python bench_early_stopping.py [--beam-size 5] [--alpha 0.0 1.0] [--max-len-ratio 1.5]
+"""
+import argparse
+import importlib.util
+import os
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+NMT_PATH = os.path.join(ROOT, "1.py")
+
+
+def load_nmt():
+    spec = importlib.util.spec_from_file_location("nmt", NMT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checkpoint", default=os.path.join(ROOT, "toy", "model_checkpoint.pth"))
+    parser.add_argument("--src", default=os.path.join(ROOT, "toy", "test.en"))
+    parser.add_argument("--ref", default=os.path.join(ROOT, "toy", "test.fr"))
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--n-best", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--max-len", type=int, default=100)
+    parser.add_argument("--max-len-ratio", type=float, default=1.5)
+    parser.add_argument("--max-len-offset", type=int, default=5)
+    parser.add_argument("--alpha", type=float, nargs="+", default=[0.0, 1.0])
+    args = parser.parse_args()
+
+    nmt = load_nmt()
+    print(f"{'alpha':>5} {'rule':>7} {'max_len':>12} {'steps/sent':>11} {'saved':>7} {'BLEU':>7} {'sent/s':>8}")
+    for alpha in args.alpha:
+        baseline = None
+        for ratio in (None, args.max_len_ratio):
+            for rule in ("never", "n_best", "bound"):
+                report = nmt.evaluate(args.checkpoint, args.src, args.ref, beam_size=args.beam_size,
+                                      length_penalty_alpha=alpha, n_best=args.n_best, max_len=args.max_len,
+                                      batch_size=args.batch_size,
+                                      early_stopping=nmt.EARLY_STOPPING_RULES[rule],
+                                      max_len_ratio=ratio, max_len_offset=args.max_len_offset)
+                steps = report["avg_steps_per_sentence"]
+                baseline = baseline or steps
+                max_len = f"{ratio}*src+{args.max_len_offset}" if ratio else str(args.max_len)
+                print(f"{alpha:>5.1f} {rule:>7} {max_len:>12} {steps:>11.1f} {1 - steps / baseline:>7.0%} "
+                      f"{report['bleu']:>7.2f} {report['sentences_per_sec']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: MarianMT inference backends (eager / int8 / compiled) x decoding (beam / greedy).
+
+For each model and backend a fresh process loads the model and records load time
+and its peak RSS (ru_maxrss). It then translates --words long words twice: once
+to warm up, which matters for the compiled backend, and once timed. Throughput is reported
+in words/sec. Outputs are compared against eager beam search as exact-match rate
+and mean character similarity, and the run fails if any setting's similarity is
+below --min-similarity.
+
+    python bench_marian_backends.py [--langs French Hindi] [--words 256] [--min-similarity 0.9]
+"""
+import argparse
+import difflib
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+
+import torch
+
+from sample_words import LONG_WORDS
+from translation_engine import (BACKENDS, GENERATION_KWARGS, GREEDY_KWARGS, MAX_BATCH_SIZE, MODEL_CATALOG,
+                                load_marian, translate_words)
+
+DECODING = {"beam": GENERATION_KWARGS, "greedy": dict(GENERATION_KWARGS, **GREEDY_KWARGS)}
+
+
+def worker(lang, backend, n_words, threads):
+    torch.set_num_threads(threads)
+    start = time.perf_counter()
+    tokenizer, model = load_marian(MODEL_CATALOG[lang], backend)
+    result = {"load_seconds": time.perf_counter() - start}
+    words = random.Random(0).sample(LONG_WORDS, min(n_words, len(LONG_WORDS)))
+    extra = random.Random(1).choices(LONG_WORDS, k=max(n_words - len(words), 0))
+    words += [f"{word}{i}" for i, word in enumerate(extra)]  # unique, so every word is generated
+    for name, kwargs in DECODING.items():
+        translate_words(tokenizer, model, words, MAX_BATCH_SIZE, generation_kwargs=kwargs)
+        start = time.perf_counter()
+        translated = translate_words(tokenizer, model, words, MAX_BATCH_SIZE, generation_kwargs=kwargs)
+        result[name] = {"words_per_sec": len(words) / (time.perf_counter() - start),
+                        "outputs": [translated[word] for word in words]}
+    # ru_maxrss is in KB on Linux; the worker is a fresh process, so this is its own peak
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(result, ensure_ascii=False))
+
+
+def run(lang, backend, args):
+    cmd = [sys.executable, __file__, "--worker", lang, backend, "--words", str(args.words),
+           "--threads", str(args.threads)]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def similarity(outputs, reference):
+    exact = sum(a == b for a, b in zip(outputs, reference)) / len(reference)
+    ratio = sum(difflib.SequenceMatcher(None, a or "", b or "").ratio() for a, b in zip(outputs, reference))
+    return exact, ratio / len(reference)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--langs", nargs="+", default=["French", "Hindi"])
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--words", type=int, default=256)
+    parser.add_argument("--threads", type=int, default=torch.get_num_threads())
+    parser.add_argument("--min-similarity", type=float, default=0.9)
+    parser.add_argument("--worker", nargs=2, metavar=("LANG", "BACKEND"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker[0], args.worker[1], args.words, args.threads)
+        return
+
+    failed = False
+    print(f"{'lang':>7} {'backend':>9} {'decoding':>8} {'load (s)':>9} {'peak MB':>9} {'words/s':>8} "
+          f"{'speedup':>8} {'exact':>6} {'similar':>8}")
+    for lang in args.langs:
+        results = {backend: run(lang, backend, args) for backend in args.backends}
+        reference = results.get("eager", next(iter(results.values())))
+        for backend, r in results.items():
+            for decoding in DECODING:
+                exact, ratio = similarity(r[decoding]["outputs"], reference["beam"]["outputs"])
+                speedup = r[decoding]["words_per_sec"] / reference["beam"]["words_per_sec"]
+                failed |= ratio < args.min_similarity
+                print(f"{lang:>7} {backend:>9} {decoding:>8} {r['load_seconds']:>9.2f} {r['peak_rss_mb']:>9.0f} "
+                      f"{r[decoding]['words_per_sec']:>8.1f} {speedup:>7.2f}x {exact:>6.0%} {ratio:>8.3f}")
+    if failed:
+        print(f"\nsome settings fell below the similarity tolerance {args.min_similarity}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: OCR translator startup, synchronous reader construction against background loading.
+
+Each scenario runs in a fresh process, so imports and model loading are cold, and
+builds the real Tk root and OCRTranslatorApp:
+  before   easyocr.Reader (load_reader, no warm-up) is built on the Tk thread
+           before the window exists and handed to the app, which is what
+           OCRTranslatorApp.__init__ used to do; the first image pays for lazy
+           initialization
+  after    the app is built at once and its background thread loads and warms
+           up the shared reader
+Time-to-window is taken after the first update_idletasks() on the constructed
+app. The simulated user picks an image --user-delay seconds after start, or when
+the app reports the reader ready if that is later, while Tk events keep being
+processed. The image then goes through app.extract_text_from_image (the OCR
+part of process_file; translation is left out). Reported: time-to-window and
+time-to-first-result (both since process start) and that first OCR call alone.
+
+Tk needs a display (use xvfb-run on a headless machine). Without EasyOCR, the
+stand-in reader below has easyocr-like costs (3s build, 1.5s lazy setup on the
+first call, 0.3s per call):
+
+    python bench_ocr_startup.py [--user-delay 2] [--reader easyocr]
+    python bench_ocr_startup.py --reader bench_ocr_startup:StandInReader
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+STARTED = time.perf_counter()
+
+
+class StandInReader:
+    """easyocr.Reader-like costs without the model: slow to build, slower first call."""
+
+    BUILD_SECONDS = 3.0
+    FIRST_CALL_SECONDS = 1.5
+    CALL_SECONDS = 0.3
+
+    def __init__(self, languages):
+        time.sleep(self.BUILD_SECONDS)
+        self.warm = False
+
+    def readtext(self, image, detail=1, paragraph=False):
+        time.sleep(self.CALL_SECONDS + (0.0 if self.warm else self.FIRST_CALL_SECONDS))
+        self.warm = True
+        return [([[0, 0], [10, 0], [10, 10], [0, 10]], "Platform 2 - Departures", 0.9)]
+
+
+def sample_image(path):
+    import cv2
+    import numpy as np
+    image = np.full((720, 1280, 3), 255, np.uint8)
+    cv2.putText(image, "Platform 2 - Departures", (80, 200), cv2.FONT_HERSHEY_SIMPLEX, 2.0, (0, 0, 0), 4)
+    cv2.putText(image, "Please keep the doors closed", (80, 400), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)
+    cv2.imwrite(path, image)
+
+
+def worker(scenario, spec, user_delay):
+    import tkinter as tk
+    from ocr_batch import load_reader
+    from ocr_translator import OCRTranslatorApp
+
+    root = tk.Tk()
+    reader = load_reader(spec, ["en"]) if scenario == "before" else None  # blocks the Tk thread
+    app = OCRTranslatorApp(root, reader_spec=spec, reader=reader)
+    root.update_idletasks()
+    window = time.perf_counter() - STARTED
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sample.png")
+        sample_image(path)
+        while time.perf_counter() - STARTED < user_delay or app.ocr_state == 'loading':
+            root.update()
+            time.sleep(0.01)
+        if app.ocr_state != 'ready':
+            raise RuntimeError(f"the {spec} reader failed to load")
+        start = time.perf_counter()
+        texts, error = app.extract_text_from_image(path)
+        first_call = time.perf_counter() - start
+    if error:
+        raise RuntimeError(error)
+    root.destroy()
+    print(json.dumps({"window": window, "first_result": time.perf_counter() - STARTED, "first_call": first_call}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-delay", type=float, default=2.0, help="seconds until the user picks an image")
+    parser.add_argument("--reader", default="easyocr", help="easyocr or module:Class")
+    parser.add_argument("--worker", choices=("before", "after"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.reader, args.user_delay)
+        return
+
+    print(f"{'startup':>8} {'to window s':>12} {'to first result s':>18} {'first OCR s':>12}")
+    for scenario in ("before", "after"):
+        cmd = [sys.executable, __file__, "--worker", scenario, "--reader", args.reader,
+               "--user-delay", str(args.user_delay)]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode:
+            sys.exit(f"{scenario} failed:\n{proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else ''}")
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{scenario:>8} {r['window']:>12.2f} {r['first_result']:>18.2f} {r['first_call']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
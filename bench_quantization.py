@@ -0,0 +1,126 @@
+"""
+Benchmark: checkpoint loading and int8 dynamic quantization.
+
+For each mode (fp32 read into memory, fp32 memory-mapped, int8 quantized) a fresh
+process loads the checkpoint, records load time, RSS and private dirty
+(unshareable) memory, then runs `1.py evaluate` on the test set for throughput and BLEU.
+The int8 BLEU delta against fp32 is checked against --max-bleu-drop.
+
+    python bench_quantization.py                       # bundled toy model
+    python bench_quantization.py --synthetic 32000     # also time a random 32k-vocab model load
+
+Private dirty memory comes from /proc/self/smaps_rollup (Linux). Pages of a
+memory-mapped checkpoint stay clean, so every worker mapping the same file
+shares them through the page cache; dirty pages are a per-process cost.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import torch
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+NMT_PATH = os.path.join(ROOT, "1.py")
+MODES = {"fp32-read": {"mmap": False, "quantize": False},
+         "fp32-mmap": {"mmap": True, "quantize": False},
+         "int8": {"mmap": True, "quantize": True}}
+
+
+def load_nmt():
+    spec = importlib.util.spec_from_file_location("nmt", NMT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def memory_mb():
+    """(rss, private dirty) in MB for this process."""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return fields["Rss"] / 1024, fields["Private_Dirty"] / 1024
+
+
+def write_synthetic_checkpoint(nmt, path, vocab_size, dim=512):
+    torch.manual_seed(0)
+    itos = [nmt.PAD_TOKEN, nmt.SOS_TOKEN, nmt.EOS_TOKEN, nmt.UNK_TOKEN] + [f"tok{i}" for i in range(4, vocab_size)]
+    vocab = nmt.Vocab.from_tokens(itos)
+    nmt.save_checkpoint(path, nmt.Encoder(vocab_size, dim, dim), nmt.AttentionDecoder(vocab_size, dim, dim),
+                        vocab, vocab, {"emb_dim": dim, "hid_dim": dim, "num_layers": 1})
+
+
+def worker(mode, checkpoint, src, ref, batch_size, decode):
+    torch.set_num_threads(1)
+    nmt = load_nmt()
+    rss_before, private_before = memory_mb()
+    start = time.perf_counter()
+    models = nmt.load_checkpoint(checkpoint, **MODES[mode])
+    load_seconds = time.perf_counter() - start
+    rss_after, private_after = memory_mb()
+    result = {"load_seconds": load_seconds, "rss_mb": rss_after - rss_before,
+              "private_mb": private_after - private_before}
+    del models
+    if decode:
+        report = nmt.evaluate(checkpoint, src, ref, batch_size=batch_size, **MODES[mode])
+        result.update(bleu=report["bleu"], sentences_per_sec=report["sentences_per_sec"],
+                      tokens_per_sec=report["tokens_per_sec"])
+    print(json.dumps(result))
+
+
+def run(mode, checkpoint, args, decode=True):
+    cmd = [sys.executable, __file__, "--worker", mode, "--checkpoint", checkpoint, "--src", args.src,
+           "--ref", args.ref, "--batch-size", str(args.batch_size)]
+    if not decode:
+        cmd.append("--no-decode")
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checkpoint", default=os.path.join(ROOT, "toy", "model_checkpoint.pth"))
+    parser.add_argument("--src", default=os.path.join(ROOT, "toy", "test.en"))
+    parser.add_argument("--ref", default=os.path.join(ROOT, "toy", "test.fr"))
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--max-bleu-drop", type=float, default=1.0)
+    parser.add_argument("--synthetic", type=int, metavar="VOCAB", help="also time loading a random model of this vocab")
+    parser.add_argument("--worker", choices=list(MODES), help=argparse.SUPPRESS)
+    parser.add_argument("--no-decode", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.checkpoint, args.src, args.ref, args.batch_size, not args.no_decode)
+        return
+
+    print(f"{'mode':>10} {'load (ms)':>10} {'RSS (MB)':>9} {'private dirty (MB)':>19} {'sent/s':>8} {'tok/s':>9} {'BLEU':>7}")
+    results = {}
+    for mode in MODES:
+        r = results[mode] = run(mode, args.checkpoint, args)
+        print(f"{mode:>10} {r['load_seconds'] * 1000:>10.1f} {r['rss_mb']:>9.1f} {r['private_mb']:>19.1f} "
+              f"{r['sentences_per_sec']:>8.1f} {r['tokens_per_sec']:>9.1f} {r['bleu']:>7.2f}")
+
+    if args.synthetic:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "synthetic.pth")
+            write_synthetic_checkpoint(load_nmt(), path, args.synthetic)
+            print(f"\nsynthetic model, vocab {args.synthetic} ({os.path.getsize(path) / 2 ** 20:.0f} MB on disk)")
+            for mode in MODES:
+                r = run(mode, path, args, decode=False)
+                print(f"{mode:>10} {r['load_seconds'] * 1000:>10.1f} {r['rss_mb']:>9.1f} {r['private_mb']:>19.1f}")
+
+    delta = results["int8"]["bleu"] - results["fp32-mmap"]["bleu"]
+    print(f"\nint8 BLEU delta vs fp32: {delta:+.2f} (allowed drop {args.max_bleu_drop})")
+    if -delta > args.max_bleu_drop:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: vocabulary shortlist decoding against full-vocabulary decoding.
+
+Builds the lexical table from the training corpus, then runs `1.py evaluate`
+on the test set with full-vocabulary decoding and with shortlists of several
+sizes, reporting the average shortlist size, speedup and BLEU difference.
+The bundled toy model has a tiny vocabulary, so --synthetic also times a
+random model with a large target vocabulary (speed only, no BLEU).
+
+    python bench_shortlist.py [--synthetic 32000]
+"""
+import argparse
+import importlib.util
+import os
+import tempfile
+import time
+
+import torch
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+NMT_PATH = os.path.join(ROOT, "1.py")
+SETTINGS = [(1, 5), (5, 20), (10, 100)]  # (top_k per source word, most frequent targets)
+
+
+def load_nmt():
+    spec = importlib.util.spec_from_file_location("nmt", NMT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic(nmt, vocab_size, beam_size, shortlist_size, n_sentences=32, dim=256):
+    torch.manual_seed(0)
+    itos = [nmt.PAD_TOKEN, nmt.SOS_TOKEN, nmt.EOS_TOKEN, nmt.UNK_TOKEN] + [f"tok{i}" for i in range(4, vocab_size)]
+    vocab = nmt.Vocab.from_tokens(itos)
+    encoder = nmt.Encoder(vocab_size, dim, dim).eval()
+    decoder = nmt.AttentionDecoder(vocab_size, dim, dim).eval()
+    with torch.no_grad():
+        decoder.out.bias[vocab.stoi[nmt.EOS_TOKEN]] = -1e4  # same number of steps for both runs
+    sources = [torch.randint(4, vocab_size, (20,)).tolist() for _ in range(n_sentences)]
+    output_ids = torch.cat([torch.tensor([vocab.stoi[nmt.EOS_TOKEN]]),
+                            torch.randperm(vocab_size - 4)[:shortlist_size - 1] + 4]).sort().values
+    timings = []
+    for ids in (None, output_ids):
+        start = time.perf_counter()
+        for src in sources:
+            nmt.batch_beam_search_decode(encoder, decoder, torch.tensor([src]), torch.tensor([len(src)]), vocab,
+                                         beam_size=beam_size, max_len=40, output_ids=ids)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checkpoint", default=os.path.join(ROOT, "toy", "model_checkpoint.pth"))
+    parser.add_argument("--train-src", default=os.path.join(ROOT, "toy", "train.en"))
+    parser.add_argument("--train-tgt", default=os.path.join(ROOT, "toy", "train.fr"))
+    parser.add_argument("--src", default=os.path.join(ROOT, "toy", "test.en"))
+    parser.add_argument("--ref", default=os.path.join(ROOT, "toy", "test.fr"))
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--synthetic", type=int, metavar="VOCAB", help="also time a random model of this vocab")
+    parser.add_argument("--synthetic-shortlist", type=int, default=300)
+    args = parser.parse_args()
+
+    torch.set_num_threads(1)
+    nmt = load_nmt()
+    with tempfile.TemporaryDirectory() as tmp:
+        table = os.path.join(tmp, "lex.json")
+        nmt.build_lexical_table(args.train_src, args.train_tgt, table)
+        full = nmt.evaluate(args.checkpoint, args.src, args.ref, beam_size=args.beam_size)
+        _, _, src_vocab, tgt_vocab = nmt.load_checkpoint(args.checkpoint)
+        print(f"{'decoding':>24} {'ids':>6} {'sent/s':>8} {'speedup':>8} {'BLEU':>7} {'dBLEU':>7}")
+        print(f"{'full vocab':>24} {len(tgt_vocab):>6} {full['sentences_per_sec']:>8.1f} {1:>7.2f}x "
+              f"{full['bleu']:>7.2f} {0:>+7.2f}")
+        with open(args.src, encoding="utf-8") as f:
+            sources = [src_vocab.encode(line.split()) for line in f]
+        for top_k, n_frequent in SETTINGS:
+            shortlist = nmt.Shortlist.load(table, src_vocab, tgt_vocab, top_k=top_k, n_frequent=n_frequent)
+            avg_ids = sum(len(shortlist.ids_for([s])) for s in sources) / max(len(sources), 1)
+            r = nmt.evaluate(args.checkpoint, args.src, args.ref, beam_size=args.beam_size, shortlist_path=table,
+                             shortlist_top_k=top_k, shortlist_frequent=n_frequent)
+            label = f"top_k={top_k} frequent={n_frequent}"
+            print(f"{label:>24} {avg_ids:>6.0f} {r['sentences_per_sec']:>8.1f} "
+                  f"{r['sentences_per_sec'] / full['sentences_per_sec']:>7.2f}x {r['bleu']:>7.2f} "
+                  f"{r['bleu'] - full['bleu']:>+7.2f}")
+
+    if args.synthetic:
+        full_s, short_s = synthetic(nmt, args.synthetic, args.beam_size, args.synthetic_shortlist)
+        print(f"\nsynthetic vocab {args.synthetic}: full {full_s:.2f}s, "
+              f"shortlist of {args.synthetic_shortlist} {short_s:.2f}s ({full_s / short_s:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: cross-frame text tracking (video_ocr.TextTracker) against keeping every detection.
+
+Simulates the OCR output of a long lecture video without decoding one, so that
+hours of video take seconds. It reuses the slide/caption timeline of
+bench_video_sampling: slides with a title and four bullet lines, plus short
+captions. One frame per --sample-seconds is "OCR'd". Every visible line is
+detected with a few pixels of bbox jitter, and a detection is dropped now and
+then (--miss-rate), like a real reader flickering. Reported:
+  per-frame   the old output: one item per detection, each language-detected
+              and translated
+  tracked     one item per track with its time range; translation calls are
+              the distinct texts
+plus items, translation calls and peak memory of building the output.
+
+    python bench_text_tracking.py [--minutes 60] [--sample-seconds 1] [--miss-rate 0.05]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from bench_video_sampling import SLIDE_TEXTS
+from video_ocr import TextTracker
+
+FPS = 30
+
+
+def timeline(minutes, slide_seconds=6.0, captions_per_minute=10, seed=0):
+    rng = random.Random(seed)
+    frames = int(minutes * 60 * FPS)
+    events = []
+    slide_frames = int(slide_seconds * FPS)
+    for i, start in enumerate(range(0, frames, slide_frames)):
+        title = SLIDE_TEXTS[i % len(SLIDE_TEXTS)]
+        end = min(start + slide_frames, frames) - 1
+        events.append((start, end, title, (40, 50, 600, 100)))
+        for line in range(4):
+            top = 145 + 50 * line
+            events.append((start, end, f"- point {line + 1} of {title.lower()}", (60, top, 700, top + 35)))
+    for i in range(int(minutes * captions_per_minute)):
+        start = rng.randrange(0, frames - 3 * FPS)
+        events.append((start, start + rng.randint(FPS, 3 * FPS), f"Caption {i % 40}", (30, 480, 500, 520)))
+    return frames, events
+
+
+def detections(frames, events, step, miss_rate, seed=1):
+    """(frame index, [(bbox, text, confidence), ...]) for every sampled frame."""
+    rng = random.Random(seed)
+    for index in range(0, frames, step):
+        found = []
+        for start, end, text, (x0, y0, x1, y1) in events:
+            if start <= index <= end and rng.random() >= miss_rate:
+                dx, dy = rng.randint(-3, 3), rng.randint(-3, 3)
+                bbox = [[x0 + dx, y0 + dy], [x1 + dx, y0 + dy], [x1 + dx, y1 + dy], [x0 + dx, y1 + dy]]
+                found.append((bbox, text, rng.uniform(0.7, 0.99)))
+        yield index, found
+
+
+def per_frame(stream):
+    items = []
+    for index, found in stream:
+        for bbox, text, confidence in found:
+            items.append({'text': text, 'confidence': confidence, 'bbox': bbox, 'frame': index})
+    return items, len(items)
+
+
+def tracked(stream):
+    tracker = TextTracker()
+    for index, found in stream:
+        tracker.update(index, found)
+    items = tracker.tracks(FPS)
+    return items, len({item['text'] for item in items})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=60.0)
+    parser.add_argument("--sample-seconds", type=float, default=1.0, help="time between OCR'd frames")
+    parser.add_argument("--miss-rate", type=float, default=0.05, help="share of detections dropped at random")
+    args = parser.parse_args()
+
+    frames, events = timeline(args.minutes)
+    step = max(1, round(args.sample_seconds * FPS))
+    print(f"{args.minutes:.0f} min at {FPS} fps, OCR every {step} frames, {len(events)} on-screen texts")
+    print(f"{'output':>10} {'items':>8} {'translations':>13} {'peak MB':>8} {'seconds':>8}")
+    for name, build in (("per-frame", per_frame), ("tracked", tracked)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        items, calls = build(detections(frames, events, step, args.miss_rate))
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+        print(f"{name:>10} {len(items):>8} {calls:>13} {peak:>8.1f} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: translation_client against the old one-blocking-call-per-string pattern.
+
+Starts mock_translation_server.py in a subprocess, so no network is needed,
+then translates --strings OCR-like strings (with repeats) three ways:
+  naive      a new connection and one request per string, like the apps used
+             to do with googletrans
+  client     TranslationClient.translate_many (dedup, batching, pooled
+             connections, bounded concurrency)
+  async      TranslationClient.atranslate_many
+It reports strings/sec, requests sent, connections opened, retries and p50/p95
+per-call latency.
+
+    python bench_translation_client.py [--strings 1000] [--latency-ms 50] [--fail-rate 0.05]
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from translation_client import HttpBackend, TranslationClient
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PHRASES = ["STOP", "EXIT", "Open 24 hours", "No parking", "Welcome to the museum", "Push", "Pull",
+           "Fire exit only", "Please keep the door closed", "Sale 50% off", "Platform 2", "Information desk",
+           "Do not enter", "Thank you for visiting", "Opening hours 9am to 5pm", "Wet floor"]
+
+
+def get(port, path):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    connection.request("GET", path)
+    data = json.loads(connection.getresponse().read())
+    connection.close()
+    return data
+
+
+def naive(port, texts, dest):
+    out = []
+    for text in texts:
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        connection.request("POST", "/translate", json.dumps({"q": text, "source": "en", "target": dest}),
+                           {"Content-Type": "application/json"})
+        out.append(json.loads(connection.getresponse().read())["translatedText"])
+        connection.close()
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--strings", type=int, default=1000)
+    parser.add_argument("--unique", type=int, default=300, help="distinct strings among them")
+    parser.add_argument("--port", type=int, default=5015)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="for the client runs (naive has no retry)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--skip-naive", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = [f"{rng.choice(PHRASES)} {i}" for i in range(args.unique)]
+    texts = [rng.choice(vocabulary) for _ in range(args.strings)]
+
+    def start_server(fail_rate):
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, "mock_translation_server.py"), "--port",
+                                   str(args.port), "--latency-ms", str(args.latency_ms), "--fail-rate",
+                                   str(fail_rate)], stdout=subprocess.PIPE, text=True)
+        server.stdout.readline()  # wait until it is listening
+        return server
+
+    print(f"{'mode':>7} {'strings/s':>10} {'requests':>9} {'connections':>12} {'retries':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8}")
+    server = start_server(0.0)
+    try:
+        if not args.skip_naive:
+            start = time.perf_counter()
+            naive(args.port, texts, "hi")
+            elapsed = time.perf_counter() - start
+            s = get(args.port, "/stats")
+            print(f"{'naive':>7} {len(texts) / elapsed:>10.1f} {s['requests']:>9} {s['connections'] - 1:>12} "
+                  f"{0:>8} {elapsed / len(texts) * 1000:>8.1f} {'-':>8}")
+    finally:
+        server.terminate()
+        server.wait()
+
+    for mode in ("client", "async"):
+        server = start_server(args.fail_rate)
+        try:
+            client = TranslationClient(HttpBackend(f"http://127.0.0.1:{args.port}", pool_size=args.concurrency),
+                                       concurrency=args.concurrency, backoff=0.05)
+            start = time.perf_counter()
+            if mode == "client":
+                out = client.translate_many(texts, dest="hi", src="en")
+            else:
+                out = asyncio.run(client.atranslate_many(texts, dest="hi", src="en"))
+            elapsed = time.perf_counter() - start
+            assert out == [f"[hi] {text}" for text in texts]
+            s, c = get(args.port, "/stats"), client.stats()
+            print(f"{mode:>7} {len(texts) / elapsed:>10.1f} {s['requests']:>9} "
+                  f"{client.backend.connections_opened:>12} {c['retries']:>8} {c['p50_ms']:>8.1f} {c['p95_ms']:>8.1f}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Load test: requests/sec and latency of translation_service.py at several concurrency levels.
+
+Each level runs that many keep-alive clients, each sending --requests-per-client
+POST /translate requests of --words random long words, and reports
+requests/sec, p50 and p99 latency, and how many generate batches the service
+ran (from GET /health). Start the service first, without the cache so every
+request reaches the model:
+
+    python translation_service.py --no-cache &
+    python bench_translation_service.py [--concurrency 1 4 16 64] [--words 3]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from sample_words import LONG_WORDS
+
+
+class Client:
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                          f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1")
+                          + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        data = json.loads(await self.reader.readexactly(length))
+        if status != 200:
+            raise RuntimeError(f"HTTP {status}: {data.get('error')}")
+        return data
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+async def run_level(args, concurrency, rng):
+    latencies = []
+
+    async def worker():
+        client = Client(args.host, args.port)
+        try:
+            for _ in range(args.requests_per_client):
+                words = [rng.choice(LONG_WORDS) + str(rng.randrange(10 ** 6)) if args.unique else rng.choice(LONG_WORDS)
+                         for _ in range(args.words)]
+                start = time.perf_counter()
+                await client.request("POST", "/translate", {"words": words, "langs": args.langs})
+                latencies.append(time.perf_counter() - start)
+        finally:
+            client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+async def main_async(args):
+    health = Client(args.host, args.port)
+    before = await health.request("GET", "/health")
+    args.langs = args.langs or before["loaded"]
+    rng = random.Random(0)
+    print(f"{'clients':>7} {'requests':>9} {'req/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'batches':>8}")
+    for concurrency in args.concurrency:
+        batches_before = sum(b["batches"] for b in before["batching"].values())
+        latencies, elapsed = await run_level(args, concurrency, rng)
+        before = await health.request("GET", "/health")
+        batches = sum(b["batches"] for b in before["batching"].values()) - batches_before
+        print(f"{concurrency:>7} {len(latencies):>9} {len(latencies) / elapsed:>8.1f} "
+              f"{percentile(latencies, 50) * 1000:>9.1f} {percentile(latencies, 99) * 1000:>9.1f} {batches:>8}")
+    health.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests-per-client", type=int, default=20)
+    parser.add_argument("--words", type=int, default=3, help="words per request")
+    parser.add_argument("--langs", nargs="+", help="default: every language the service has loaded")
+    parser.add_argument("--unique", action="store_true",
+                        help="make every word unique, so nothing is shared between merged requests")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: two-stage OCR (ocr_batch.two_stage_readtext) against the full-frame path.
+
+Builds a synthetic set of large images with known text: 4K video frames
+(gradient background, noise, a few caption-sized lines) and A4 scans at 300
+dpi (dozens of body-text lines). Each image goes through:
+  full-frame   preprocess_image on the whole image, then readtext
+               (what OCRTranslatorApp and ocr_batch do by default)
+  two-stage    detection on a copy downscaled by each --detect-scales value,
+               preprocessing + recognition of the regions at --recognize-scale
+Reported per path: seconds per image, speedup over full-frame, word recall
+(share of the ground-truth words that were read exactly) and mean confidence.
+
+    python bench_two_stage_ocr.py [--frames 4] [--scans 2] [--detect-scales 0.5 0.25] [--reader easyocr]
+"""
+import argparse
+import random
+import time
+
+import cv2
+import numpy as np
+
+from ocr_batch import RECOGNIZE_SCALE, load_reader, preprocess_image, two_stage_readtext
+
+WORDS = ["invoice", "total", "amount", "customer", "delivery", "address", "station", "platform", "departure",
+         "arrival", "welcome", "museum", "gallery", "exhibition", "opening", "hours", "monday", "friday",
+         "emergency", "exit", "please", "keep", "door", "closed", "thank", "you", "for", "visiting", "order",
+         "number", "date", "signature", "payment", "received", "balance", "account", "reference", "notice"]
+
+
+def make_frame(rng, size=(3840, 2160)):
+    width, height = size
+    gradient = np.linspace(40, 200, width, dtype=np.float32)[None, :, None]
+    frame = np.repeat(np.repeat(gradient, height, axis=0), 3, axis=2)
+    frame += np.random.default_rng(rng.randrange(1 << 30)).normal(0, 6, frame.shape).astype(np.float32)
+    frame = frame.clip(0, 255).astype(np.uint8)
+    lines = []
+    for i in range(rng.randint(2, 4)):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5)))
+        x, y = rng.randint(100, 1200), 300 + i * 500 + rng.randint(0, 200)
+        (w, h), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_DUPLEX, 3.0, 6)
+        cv2.rectangle(frame, (x - 30, y - h - 30), (x + w + 30, y + 40), (20, 20, 20), -1)
+        cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_DUPLEX, 3.0, (255, 255, 255), 6)
+        lines.append(text)
+    return frame, lines
+
+
+def make_scan(rng, size=(2480, 3508)):
+    width, height = size
+    page = np.full((height, width, 3), 235, np.uint8)
+    lines = []
+    for y in range(250, height - 250, 110):
+        if rng.random() < 0.3:
+            continue  # paragraph breaks
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 8)))
+        cv2.putText(page, text, (200, y), cv2.FONT_HERSHEY_SIMPLEX, 1.6, (30, 30, 30), 3)
+        lines.append(text)
+    return page, lines
+
+
+def score(results, lines):
+    found = {word for _, text, _ in results for word in text.lower().split()}
+    truth = [word for line in lines for word in line.split()]
+    recall = sum(word in found for word in truth) / max(len(truth), 1)
+    confidence = float(np.mean([c for _, _, c in results])) if results else 0.0
+    return recall, confidence
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=4, help="4K video frames")
+    parser.add_argument("--scans", type=int, default=2, help="A4 300 dpi scans")
+    parser.add_argument("--detect-scales", type=float, nargs="+", default=[0.5, 0.25])
+    parser.add_argument("--recognize-scale", type=float, default=RECOGNIZE_SCALE)
+    parser.add_argument("--reader", default="easyocr", help="easyocr or module:Class")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    images = [make_frame(rng) for _ in range(args.frames)] + [make_scan(rng) for _ in range(args.scans)]
+    reader = load_reader(args.reader, ["en"])
+    reader.readtext(images[0][0][:256, :256], detail=1)  # warm-up: first-call setup is not OCR time
+
+    paths = [("full-frame", lambda image: reader.readtext(preprocess_image(image), detail=1, paragraph=False))]
+    for scale in args.detect_scales:
+        paths.append((f"two-stage {scale:g}/{args.recognize_scale:g}",
+                      lambda image, scale=scale: two_stage_readtext(reader, image, scale, args.recognize_scale)))
+
+    print(f"{len(images)} images ({args.frames} x 4K frame, {args.scans} x A4 scan)")
+    print(f"{'path':>18} {'s/image':>8} {'speedup':>8} {'word recall':>12} {'confidence':>11}")
+    baseline = None
+    for name, readtext in paths:
+        seconds, recalls, confidences = [], [], []
+        for image, lines in images:
+            start = time.perf_counter()
+            results = readtext(image)
+            seconds.append(time.perf_counter() - start)
+            recall, confidence = score(results, lines)
+            recalls.append(recall)
+            confidences.append(confidence)
+        mean = sum(seconds) / len(seconds)
+        baseline = baseline or mean
+        print(f"{name:>18} {mean:>8.2f} {baseline / mean:>7.1f}x {np.mean(recalls):>12.1%} {np.mean(confidences):>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
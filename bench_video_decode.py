@@ -0,0 +1,111 @@
+"""
+Benchmark: threaded, grab()-skipping video decode (video_ocr.ocr_video) against read()-every-frame loops.
+
+Uses the synthetic slide/caption video from bench_video_sampling. It reports
+frames/sec (video frames over wall time) for:
+  decode-only   read() of every frame, against grab() with retrieve() of every
+                30th frame or of the frames FrameSampler checks
+  decode+OCR    the original serial loop (read() everything, OCR every 30th),
+                a serial read() loop with the change sampler, and ocr_video with
+                1 and 2 OCR workers
+OCR is a stand-in that sleeps --ocr-ms per call (a real reader releases the
+GIL the same way during inference); with --easyocr, the real reader runs.
+
+    python bench_video_decode.py [--seconds 30] [--ocr-ms 200] [--video sample.mp4] [--easyocr]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+
+from bench_video_sampling import FIXED_INTERVAL, make_synthetic_video, stand_in_ocr
+from video_ocr import FrameSampler, ocr_video, sampled_frames
+
+
+def read_all(path, select, readtext):
+    """The old loop: read() every frame; OCR the ones select(index, frame) picks."""
+    cap = cv2.VideoCapture(path)
+    frames = calls = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if select(frames, frame):
+            readtext(frame)
+            calls += 1
+        frames += 1
+    cap.release()
+    return frames, calls
+
+
+def grab_every(path, interval):
+    cap = cv2.VideoCapture(path)
+    frames = calls = 0
+    while cap.grab():
+        frames += 1
+        if frames % interval == 0:
+            calls += cap.retrieve()[0]
+    cap.release()
+    return frames, calls
+
+
+def grab_sampled(path):
+    cap = cv2.VideoCapture(path)
+    sampler = FrameSampler(cap.get(cv2.CAP_PROP_FPS))
+    calls = sum(1 for _ in sampled_frames(cap, sampler))
+    cap.release()
+    return sampler.frames, calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--ocr-ms", type=float, default=200.0, help="stand-in OCR cost per call")
+    parser.add_argument("--video", help="use (and keep) this synthetic video path")
+    parser.add_argument("--easyocr", action="store_true", help="run the real EasyOCR reader")
+    args = parser.parse_args()
+
+    path = args.video or os.path.join(tempfile.mkdtemp(), "synthetic.mp4")
+    make_synthetic_video(path, args.seconds)
+    if args.easyocr:
+        import easyocr
+        reader = easyocr.Reader(["en"])
+        readtext = lambda frame: reader.readtext(frame, detail=1, paragraph=False)  # noqa: E731
+    else:
+        readtext = stand_in_ocr(args.ocr_ms / 1000)
+    fps = cv2.VideoCapture(path).get(cv2.CAP_PROP_FPS)
+
+    def fixed(index, frame):
+        return (index + 1) % FIXED_INTERVAL == 0
+
+    def changed():
+        sampler = FrameSampler(fps)
+        return lambda index, frame: sampler.should_ocr(index, frame)
+
+    runs = [
+        ("decode-only", "read() every frame", lambda: read_all(path, lambda i, f: False, readtext)),
+        ("decode-only", "grab(), retrieve() every 30th", lambda: grab_every(path, FIXED_INTERVAL)),
+        ("decode-only", "grab() + sampler retrieve()", lambda: grab_sampled(path)),
+        ("decode+OCR", "serial read(), every 30th", lambda: read_all(path, fixed, readtext)),
+        ("decode+OCR", "serial read(), on change", lambda: read_all(path, changed(), readtext)),
+    ]
+    for workers in (1, 2):
+        def threaded(workers=workers):
+            results, stats = ocr_video(path, readtext, workers=workers)
+            return stats["frames"], len(results)
+        runs.append(("decode+OCR", f"ocr_video, {workers} OCR worker{'s' * (workers > 1)}", threaded))
+
+    print(f"{'':>11} {'loop':<30} {'frames':>7} {'OCR calls':>10} {'wall s':>7} {'frames/s':>9}")
+    for group, name, run in runs:
+        start = time.perf_counter()
+        frames, calls = run()
+        elapsed = time.perf_counter() - start
+        print(f"{group:>11} {name:<30} {frames:>7} {calls:>10} {elapsed:>7.1f} {frames / elapsed:>9.1f}")
+    if not args.video:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark: change-detection frame sampling (video_ocr.FrameSampler) against OCR on every 30th frame.
+
+Writes a synthetic lecture-style video: slides that change every few seconds,
+short captions that show for under a second, a moving cursor and sensor noise.
+It then runs both samplers over it end to end (decode, sampling, OCR). OCR is
+a stand-in that sleeps --ocr-ms per call; with --easyocr and EasyOCR installed,
+the real reader runs instead. Reported per sampler: OCR calls, calls saved
+against every-30, wall time, speedup, and how many slides and captions got
+at least one OCR'd frame.
+
+    python bench_video_sampling.py [--seconds 60] [--captions 10] [--ocr-ms 200] [--video sample.mp4] [--easyocr]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from video_ocr import FrameSampler, sampled_frames
+
+FIXED_INTERVAL = 30
+SLIDE_TEXTS = ["Welcome to the course", "Chapter 1: Introduction", "Key terms and definitions",
+               "Example: a worked problem", "Summary of the results", "Questions and discussion",
+               "Chapter 2: Methods", "Data collection", "Thank you"]
+
+
+def make_synthetic_video(path, seconds=60.0, fps=30, size=(960, 540), slide_seconds=6.0, captions=10, seed=0):
+    """Write the video; returns its events as (kind, first frame, last frame, text)."""
+    rng = random.Random(seed)
+    width, height = size
+    frames = int(seconds * fps)
+    events = []
+    slide_frames = int(slide_seconds * fps)
+    for i, start in enumerate(range(0, frames, slide_frames)):
+        events.append(("slide", start, min(start + slide_frames, frames) - 1, SLIDE_TEXTS[i % len(SLIDE_TEXTS)]))
+    for i in range(captions):
+        start = rng.randrange(0, frames - fps)
+        length = rng.randint(fps // 3, fps - 1)  # under a second: often between two fixed samples
+        events.append(("caption", start, start + length - 1, f"Caption {i}: {rng.choice(SLIDE_TEXTS).lower()}"))
+    noise = [np.random.default_rng(i).integers(-6, 7, (height, width, 1), dtype=np.int16) for i in range(8)]
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    try:
+        for index in range(frames):
+            slide = next(e for e in events if e[0] == "slide" and e[1] <= index <= e[2])
+            shade = 200 + 40 * (SLIDE_TEXTS.index(slide[3]) % 2)
+            frame = np.full((height, width, 3), shade, np.int16)
+            frame += noise[index % len(noise)]
+            frame = frame.clip(0, 255).astype(np.uint8)
+            cv2.putText(frame, slide[3], (40, 90), cv2.FONT_HERSHEY_SIMPLEX, 1.4, (30, 30, 30), 3)
+            for line in range(4):
+                cv2.putText(frame, f"- point {line + 1} of {slide[3].lower()}", (60, 170 + 50 * line),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (60, 60, 60), 2)
+            for kind, first, last, text in events:
+                if kind == "caption" and first <= index <= last:
+                    cv2.rectangle(frame, (0, height - 70), (width, height), (0, 0, 0), -1)
+                    cv2.putText(frame, text, (30, height - 25), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 255), 2)
+            x = int(width / 2 + width / 3 * np.sin(index / fps))  # a cursor: motion without new text
+            cv2.circle(frame, (x, height // 2 + 60), 6, (0, 0, 255), -1)
+            writer.write(frame)
+    finally:
+        writer.release()
+    return events
+
+
+def stand_in_ocr(delay):
+    def readtext(frame, **kwargs):
+        time.sleep(delay)
+        return []
+    return readtext
+
+
+def run(path, mode, readtext):
+    cap = cv2.VideoCapture(path)
+    ocr_frames = []
+    start = time.perf_counter()
+    if mode == "adaptive":
+        sampler = FrameSampler(cap.get(cv2.CAP_PROP_FPS))
+        for index, frame in sampled_frames(cap, sampler):
+            readtext(frame, detail=1, paragraph=False)
+            ocr_frames.append(index)
+        frame_count = sampler.frames
+    else:
+        frame_count = 0
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frame_count += 1
+            if frame_count % FIXED_INTERVAL == 0:
+                readtext(frame, detail=1, paragraph=False)
+                ocr_frames.append(frame_count - 1)  # events count frames from 0
+    cap.release()
+    return frame_count, ocr_frames, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--captions", type=int, default=10, help="short captions placed at random times")
+    parser.add_argument("--ocr-ms", type=float, default=200.0, help="stand-in OCR cost per call")
+    parser.add_argument("--video", help="use (and keep) this synthetic video path")
+    parser.add_argument("--easyocr", action="store_true", help="run the real EasyOCR reader")
+    args = parser.parse_args()
+
+    path = args.video or os.path.join(tempfile.mkdtemp(), "synthetic.mp4")
+    start = time.perf_counter()
+    events = make_synthetic_video(path, args.seconds, captions=args.captions)
+    print(f"Wrote {path} ({args.seconds:.0f}s) in {time.perf_counter() - start:.1f}s")
+    if args.easyocr:
+        import easyocr
+        readtext = easyocr.Reader(["en"]).readtext
+    else:
+        readtext = stand_in_ocr(args.ocr_ms / 1000)
+
+    print(f"{'mode':>9} {'frames':>7} {'OCR calls':>10} {'saved':>6} {'wall s':>7} {'speedup':>8} "
+          f"{'slides':>7} {'captions':>9}")
+    baseline = None
+    for mode in ("every-30", "adaptive"):
+        frames, ocr_frames, elapsed = run(path, mode, readtext)
+        ocr_frames = np.array(ocr_frames)
+        caught = {kind: sum(bool(((ocr_frames >= first) & (ocr_frames <= last)).any())
+                            for k, first, last, _ in events if k == kind) for kind in ("slide", "caption")}
+        totals = {kind: sum(e[0] == kind for e in events) for kind in caught}
+        baseline = baseline or (len(ocr_frames), elapsed)
+        print(f"{mode:>9} {frames:>7} {len(ocr_frames):>10} {baseline[0] - len(ocr_frames):>6} {elapsed:>7.1f} "
+              f"{baseline[1] / elapsed:>7.1f}x {caught['slide']:>3}/{totals['slide']:<3} "
+              f"{caught['caption']:>4}/{totals['caption']:<4}")
+    if not args.video:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,8 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
-from transformers import MarianMTModel, MarianTokenizer
-import torch
-import re
+import time
+from translation_engine import TranslationEngine, SUPPORTED_LANGS, filter_words_by_length
 
 class DualLanguageTranslator:
     def __init__(self, root):
@@ -12,34 +11,31 @@ class DualLanguageTranslator:
         self.root.title("Dual Language Translator - English to French & Hindi")
         self.root.geometry("800x600")
         
-        self.supported_langs = {
-            'French': 'Helsinki-NLP/opus-mt-en-fr',
-            'Hindi': 'Helsinki-NLP/opus-mt-en-hi'
-        }
+        self.supported_langs = SUPPORTED_LANGS
         
-        self.models = {}
-        self.tokenizers = {}
+        self.engine = TranslationEngine(default_langs=list(self.supported_langs))
         self.load_models()
         
         self.setup_gui()
+        self.update_model_status()
         
         self.translate_results = {'French': '', 'Hindi': '', 'Summary': ''}
 
     def load_models(self):
-        """Load models in a background thread to avoid freezing GUI."""
-        def load():
-            for lang, model_name in self.supported_langs.items():
-                try:
-                    tokenizer = MarianTokenizer.from_pretrained(model_name)
-                    model = MarianMTModel.from_pretrained(model_name)
-                    self.tokenizers[lang] = tokenizer
-                    self.models[lang] = model
-                    print(f"Loaded {lang} model successfully.")
-                except Exception as e:
-                    messagebox.showerror("Model Load Error", f"Failed to load {lang}: {str(e)}")
-                    print(f"Error loading {lang}: {e}")
-        
-        threading.Thread(target=load, daemon=True).start()
+        """Preload the models in a background thread to avoid freezing GUI.
+
+        Translating before they are ready just waits for the load in progress.
+        """
+        def on_error(lang, e):
+            messagebox.showerror("Model Load Error", f"Failed to load {lang}: {str(e)}")
+            print(f"Error loading {lang}: {e}")
+        
+        threading.Thread(target=self.engine.preload, args=(None, on_error), daemon=True).start()
+
+    def update_model_status(self):
+        states = self.engine.registry.states()
+        self.model_status.set("Models: " + ", ".join(f"{lang} {states[lang]}" for lang in self.supported_langs))
+        self.root.after(500, self.update_model_status)
 
     def setup_gui(self):
         main_frame = ttk.Frame(self.root, padding="10")
@@ -53,6 +49,8 @@ class DualLanguageTranslator:
         ttk.Button(main_frame, text="Translate", command=self.start_translation).grid(row=2, column=1, sticky=tk.E, padx=5)
 
         ttk.Label(main_frame, text="Translation Results").grid(row=3, column=0, sticky=tk.W, pady=(20, 5))
+        self.model_status = tk.StringVar(value="Models: loading...")
+        ttk.Label(main_frame, textvariable=self.model_status).grid(row=3, column=1, sticky=tk.E, pady=(20, 5))
         
         self.notebook = ttk.Notebook(main_frame)
         self.notebook.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
@@ -97,11 +95,7 @@ class DualLanguageTranslator:
 
     def filter_words_by_length(self, text):
         """Filter words that have 10 or more characters"""
-        words = re.findall(r'\b\w+\b', text)  # Extract all words
-        long_words = [word for word in words if len(word) >= 10]
-        short_words = [word for word in words if len(word) < 10]
-        
-        return long_words, short_words
+        return filter_words_by_length(text)
 
     def start_translation(self):
         text = self.input_text.get(1.0, tk.END).strip()
@@ -131,47 +125,52 @@ class DualLanguageTranslator:
         threading.Thread(target=self.translate_text, args=(long_words,), daemon=True).start()
 
     def translate_text(self, long_words):
-        """Translate long words in background thread."""
+        """Translate long words in background thread.
+
+        The language pipelines run concurrently, each with its share of the CPU
+        threads, and every finished batch is appended to its tab right away.
+        The tabs are rewritten in input order once all languages are done.
+        """
         try:
             translations = {'French': [], 'Hindi': []}
-            
-            # French
-            if 'French' in self.models:
-                tokenizer = self.tokenizers['French']
-                model = self.models['French']
-                
-                for word in long_words:
-                    try:
-                        inputs = tokenizer(word, return_tensors="pt", padding=True)
-                        with torch.no_grad():
-                            outputs = model.generate(**inputs, max_length=50)
-                        translated = tokenizer.decode(outputs[0], skip_special_tokens=True)
-                        translations['French'].append(f"{word} → {translated}")
-                    except Exception as e:
-                        translations['French'].append(f"{word} → [Translation Error]")
-            
-           
-            if 'Hindi' in self.models:
-                tokenizer = self.tokenizers['Hindi']
-                model = self.models['Hindi']
-                
-                for word in long_words:
-                    try:
-                        inputs = tokenizer(word, return_tensors="pt", padding=True)
-                        with torch.no_grad():
-                            outputs = model.generate(**inputs, max_length=50)
-                        translated = tokenizer.decode(outputs[0], skip_special_tokens=True)
-                        translations['Hindi'].append(f"{word} → {translated}")
-                    except Exception as e:
-                        translations['Hindi'].append(f"{word} → [Translation Error]")
-            
+            start = time.perf_counter()
+            first_result = []
+            self.root.after(0, self.update_results, {'French': '', 'Hindi': '', 'Summary': 'Translating...'})
+
+            def stream(lang, batch):
+                if batch and not first_result:
+                    first_result.append(time.perf_counter() - start)
+                lines = "".join(self.format_translation(word, batch[word]) + "\n" for word in batch)
+                self.root.after(0, self.append_result, lang, lines)
+
+            errors = {}
+            results = self.engine.translate(long_words, list(translations), on_batch=stream,
+                                            on_error=lambda lang, e: errors.__setitem__(lang, e))
+            for lang, translated in results.items():
+                if translated is None:  # that model failed; the other language is still shown
+                    translations[lang] = [f"[{lang} model unavailable: {errors.get(lang)}]"]
+                    continue
+                translations[lang] = [self.format_translation(word, translated[word]) for word in long_words]
+            elapsed = time.perf_counter() - start
+
             self.translate_results['French'] = "\n".join(translations['French'])
             self.translate_results['Hindi'] = "\n".join(translations['Hindi'])
+            cache = self.engine.stats()
+            models = self.engine.model_stats()
+            model_summary = ", ".join(
+                f"{lang} {models[lang]['state']} (load {models[lang]['load_seconds'] or 0:.1f}s, "
+                f"{models[lang]['params_mb'] or 0:.0f} MB, hit rate {models[lang]['hit_rate'] or 0:.0%})"
+                for lang in translations)
             self.translate_results['Summary'] = (
                 f"📊 Translation Summary\n"
                 f"• Words Processed: {len(long_words)}\n"
-                f"• French Translations: {len(translations['French'])}\n"
-                f"• Hindi Translations: {len(translations['Hindi'])}\n\n"
+                f"• French Translations: {0 if 'French' in errors else len(translations['French'])}\n"
+                f"• Hindi Translations: {0 if 'Hindi' in errors else len(translations['Hindi'])}\n"
+                f"• Time to first result: {first_result[0] if first_result else elapsed:.2f}s, "
+                f"total: {elapsed:.2f}s ({self.engine.num_threads} threads per model)\n"
+                f"• Cache: {cache['memory_hits']} memory hits, {cache['disk_hits']} disk hits, "
+                f"{cache['misses']} misses, {cache['evictions']} evictions\n"
+                f"• Models: {model_summary}\n\n"
                 f"French Translations:\n{self.translate_results['French']}\n\n"
                 f"Hindi Translations:\n{self.translate_results['Hindi']}"
             )
@@ -181,6 +180,17 @@ class DualLanguageTranslator:
         except Exception as e:
             self.root.after(0, lambda: messagebox.showerror("Translation Error", str(e)))
 
+    @staticmethod
+    def format_translation(word, translated):
+        if translated is None:
+            return f"{word} → [Translation Error]"
+        return f"{word} → {translated}"
+
+    def append_result(self, lang, lines):
+        widget = {'French': self.french_text, 'Hindi': self.hindi_text}[lang]
+        widget.insert(tk.END, lines)
+        widget.see(tk.END)
+
     def update_results(self, translations):
         self.french_text.delete(1.0, tk.END)
         self.french_text.insert(tk.END, translations.get('French', 'No translations available.\n\n💡 Tip: Only words with 10+ characters are translated.'))
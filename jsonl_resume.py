@@ -0,0 +1,28 @@
+"""
+Resume support for the batch tools that append one JSON record per input file to a JSONL output.
+"""
+import json
+import os
+
+
+def done_files(out_path):
+    """
+    Files already completed in the output. Records marked "complete": false are not
+    counted, and a last line cut off by an interrupted run is removed, so those files are redone.
+    """
+    done, size = set(), 0
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, "rb+") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            size += len(line)
+            try:
+                record = json.loads(line)
+                if record.get("complete", True):
+                    done.add(record["file"])
+            except (ValueError, KeyError, AttributeError):
+                pass
+        f.truncate(size)
+    return done
@@ -0,0 +1,46 @@
+"""
+Minimal asyncio HTTP/1.1 server helpers shared by translation_service.py and mock_translation_server.py.
+
+Enough for JSON request/response APIs over keep-alive connections, not a general server.
+"""
+import json
+
+
+class BodyTooLarge(Exception):
+    """The request's Content-Length exceeds the server's limit."""
+
+
+async def read_request(reader, max_body=None):
+    """(method, path, headers, body) of the next request, or None at end of stream.
+
+    Header names are lower-cased. Raises BodyTooLarge, without reading the body,
+    when Content-Length is above max_body.
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if max_body is not None and length > max_body:
+        raise BodyTooLarge(f"request body of {length} bytes is over {max_body}")
+    return method, path, headers, await reader.readexactly(length)
+
+
+def json_response(status, payload, close=False):
+    """Bytes of an HTTP/1.1 response with a JSON body."""
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    return (f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n").encode("latin-1") + data
+
+
+def wants_close(headers):
+    return headers.get("connection", "").lower() == "close"
@@ -0,0 +1,97 @@
+"""
+Local mock translation server for offline throughput tests of translation_client.
+
+Speaks the LibreTranslate-style API that translation_client.HttpBackend uses:
+
+    POST /translate  {"q": ["hello", ...], "source": "en", "target": "hi"}
+                     -> {"translatedText": ["[hi] hello", ...]}
+    GET  /stats      -> {"requests": ..., "items": ..., "connections": ..., "failed": ...}
+
+Each request costs --latency-ms, like a network round-trip, plus --per-item-ms
+per string. --fail-rate answers that share of requests with HTTP 503 so that
+the client's retries can be exercised.
+
+    python mock_translation_server.py [--port 5005] [--latency-ms 50] [--fail-rate 0.05]
+    TRANSLATION_API_URL=http://127.0.0.1:5005 python ocr_translator.py
+"""
+import argparse
+import asyncio
+import json
+import random
+
+from minihttp import json_response, read_request, wants_close
+
+
+class MockTranslationServer:
+    def __init__(self, latency_ms=50.0, per_item_ms=0.5, fail_rate=0.0, seed=None):
+        self.latency = latency_ms / 1000
+        self.per_item = per_item_ms / 1000
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.requests = self.items = self.connections = self.failed = 0
+
+    def stats(self):
+        return {"requests": self.requests, "items": self.items, "connections": self.connections,
+                "failed": self.failed}
+
+    async def respond(self, method, path, body):
+        if method == "GET" and path == "/stats":
+            return 200, self.stats()
+        if method != "POST" or path != "/translate":
+            return 404, {"error": f"no route for {method} {path}"}
+        try:
+            payload = json.loads(body)
+            texts = payload["q"]
+        except (ValueError, KeyError):
+            return 400, {"error": "expected JSON with 'q'"}
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        self.requests += 1
+        await asyncio.sleep(self.latency + self.per_item * len(texts))
+        if self.random.random() < self.fail_rate:
+            self.failed += 1
+            return 503, {"error": "injected failure"}
+        self.items += len(texts)
+        translated = [f"[{payload.get('target', '?')}] {text}" for text in texts]
+        return 200, {"translatedText": translated[0] if single else translated}
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self.respond(method, path, body)
+                writer.write(json_response(status, payload, wants_close(headers)))
+                await writer.drain()
+                if wants_close(headers):
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(server, host, port):
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"Mock translation server on http://{host}:{port}", flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5005)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--per-item-ms", type=float, default=0.5)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(serve(MockTranslationServer(args.latency_ms, args.per_item_ms, args.fail_rate),
+                      args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
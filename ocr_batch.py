@@ -0,0 +1,357 @@
+"""
+Headless batch OCR + translation of a folder (or glob) of images.
+
+Images are spread over a process pool. Each worker builds its OCR reader
+once, with torch and OpenCV limited to --threads intra-op threads, so that
+workers x threads does not oversubscribe the cores. A worker reads,
+preprocesses, OCRs and language-detects an image. The parent collects
+finished images and translates the English text of --translate-batch images
+in one batched translate_many call on the shared translation client. Each
+image is then appended to the output JSONL with its texts and per-image
+timings. Images already in the output are skipped, so a nightly run that
+was interrupted resumes where it stopped. If a worker cannot build its
+reader, the run stops with that error instead of skipping every image.
+
+    python ocr_batch.py scans/ results.jsonl --dest fr --workers 4
+    python ocr_batch.py "scans/**/*.png" results.jsonl --workers 2 --threads 2 --no-translate
+    python ocr_batch.py frames_4k/ results.jsonl --two-stage --detect-scale 0.25
+
+Readers come from get_reader(), a process-wide cache of warmed-up readers
+that the GUI shares too. The reader is easyocr.Reader by default, or any
+"module:Class" built as Class(languages) with a readtext(image, detail=1,
+paragraph=False) method (and detect/recognize like easyocr's for
+--two-stage). --two-stage is meant
+for 4K frames and large scans. Text detection runs on a copy downscaled by
+--detect-scale, and the boxes are mapped back. CLAHE/Otsu preprocessing and
+recognition then run only on those regions, at --recognize-scale of full
+resolution.
+"""
+import argparse
+import functools
+import glob
+import importlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import cv2
+import langdetect
+import numpy as np
+from langdetect import DetectorFactory
+
+from jsonl_resume import done_files
+
+DetectorFactory.seed = 0
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff')
+MIN_CONFIDENCE = 0.5
+DETECT_CACHE_SIZE = 4096
+TRANSLATE_BATCH = 16
+DETECT_SCALE = 0.5  # two-stage mode: detection runs on a copy this size
+RECOGNIZE_SCALE = 1.0  # and recognition on text regions at this share of full resolution
+CROP_PAD = 0.15  # region margin (share of its height) included in the preprocessed crop
+
+_worker = {}
+
+
+class ReaderInitError(RuntimeError):
+    """A batch worker could not build its OCR reader; raised instead of skipping every image."""
+
+
+def preprocess_image(image):
+    """Preprocess image for better OCR results"""
+    if len(image.shape) == 3:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    else:
+        gray = image.copy()
+
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+    enhanced = clahe.apply(gray)
+
+    blurred = cv2.GaussianBlur(enhanced, (1, 1), 0)
+
+    _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    return thresh
+
+
+def two_stage_readtext(reader, image, detect_scale=DETECT_SCALE, recognize_scale=RECOGNIZE_SCALE, pad=CROP_PAD):
+    """
+    readtext() in two stages for large images: detect text regions on a copy
+    downscaled by detect_scale, map the boxes back, and preprocess and recognize
+    only those regions, at recognize_scale of full resolution. Returns
+    readtext(detail=1)-style (bbox, text, confidence) in full-resolution pixels.
+    """
+    small = cv2.resize(image, None, fx=detect_scale, fy=detect_scale, interpolation=cv2.INTER_AREA)
+    horizontal, free = reader.detect(small, min_size=max(1, int(20 * detect_scale)))
+    if len(horizontal) == 1 and (len(horizontal[0]) == 0 or not np.isscalar(horizontal[0][0])):
+        horizontal, free = horizontal[0], free[0]  # easyocr >= 1.6 returns one list per image
+    if not horizontal and not free:
+        return []
+
+    factor = recognize_scale / detect_scale
+    height, width = image.shape[:2]
+    canvas_h, canvas_w = int(height * recognize_scale), int(width * recognize_scale)
+    canvas = np.full((canvas_h, canvas_w), 255, np.uint8)  # only the text regions get filled in
+    horizontal = [[int(x0 * factor), int(x1 * factor), int(y0 * factor), int(y1 * factor)]
+                  for x0, x1, y0, y1 in horizontal]
+    free = [[[int(x * factor), int(y * factor)] for x, y in polygon] for polygon in free]
+    regions = horizontal + [[min(x for x, _ in p), max(x for x, _ in p), min(y for _, y in p), max(y for _, y in p)]
+                            for p in free]
+    for x0, x1, y0, y1 in regions:
+        margin = int((y1 - y0) * pad)
+        x0, y0 = max(0, x0 - margin), max(0, y0 - margin)
+        x1, y1 = min(canvas_w, x1 + margin), min(canvas_h, y1 + margin)
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            continue
+        crop = image[int(y0 / recognize_scale):int(y1 / recognize_scale),
+                     int(x0 / recognize_scale):int(x1 / recognize_scale)]
+        if recognize_scale != 1.0:
+            crop = cv2.resize(crop, (x1 - x0, y1 - y0), interpolation=cv2.INTER_AREA)
+        canvas[y0:y0 + crop.shape[0], x0:x0 + crop.shape[1]] = preprocess_image(crop)
+
+    results = reader.recognize(canvas, horizontal_list=horizontal, free_list=free, detail=1, paragraph=False)
+    return [([[x / recognize_scale, y / recognize_scale] for x, y in bbox], text, confidence)
+            for bbox, text, confidence in results]
+
+
+@functools.lru_cache(maxsize=DETECT_CACHE_SIZE)
+def _detect_language(normalized):
+    """langdetect is deterministic with the seed above, so results can be memoized per string"""
+    try:
+        if len(normalized) < 3:
+            return 'unknown'
+
+        detected = langdetect.detect(normalized)
+        return detected if detected == 'en' else 'non-english'
+
+    except:
+        return 'unknown'
+
+
+def detect_language(text):
+    """Detect if text is English (memoized per whitespace-normalized string)"""
+    return _detect_language(" ".join(text.split()))
+
+
+def load_reader(spec, languages):
+    if spec == "easyocr":
+        import easyocr
+        return easyocr.Reader(languages)
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)(languages)
+
+
+def warm_up(reader):
+    """One small readtext, so the first real image doesn't pay for lazy initialization."""
+    image = np.full((64, 320), 255, np.uint8)
+    cv2.putText(image, "Warm up 123", (10, 45), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 0, 2)
+    reader.readtext(image, detail=1, paragraph=False)
+
+
+_readers = {}  # (spec, languages) -> warmed-up reader
+_loading = {}  # (spec, languages) -> threading.Event set when the load finishes
+_reader_errors = {}
+_readers_lock = threading.Lock()
+
+
+def reader_state(spec="easyocr", languages=("en",)):
+    """'unloaded', 'loading', 'ready' or 'failed'."""
+    key = (spec, tuple(languages))
+    with _readers_lock:
+        if key in _readers:
+            return 'ready'
+        if key in _loading:
+            return 'loading'
+        return 'failed' if key in _reader_errors else 'unloaded'
+
+
+def get_reader(spec="easyocr", languages=("en",)):
+    """The process-wide warmed-up reader for (spec, languages); concurrent first calls wait for one load."""
+    key = (spec, tuple(languages))
+    with _readers_lock:
+        if key in _readers:
+            return _readers[key]
+        event = _loading.get(key)
+        owner = event is None
+        if owner:
+            event = _loading[key] = threading.Event()
+            _reader_errors.pop(key, None)
+    if not owner:
+        event.wait()
+        with _readers_lock:
+            if key in _readers:
+                return _readers[key]
+            raise RuntimeError(f"loading the {spec} reader failed: {_reader_errors.get(key)}")
+    try:
+        reader = load_reader(spec, list(languages))
+        warm_up(reader)
+        with _readers_lock:
+            _readers[key] = reader
+        return reader
+    except Exception as e:
+        with _readers_lock:
+            _reader_errors[key] = e
+        raise
+    finally:
+        with _readers_lock:
+            del _loading[key]
+        event.set()
+
+
+def _init_worker(reader, languages, threads, two_stage=None):
+    cv2.setNumThreads(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    try:
+        _worker["reader"] = get_reader(reader, languages)
+    except Exception as e:  # an exception here would only break the pool, without saying why
+        _worker["init_error"] = f"{type(e).__name__}: {e}"
+    _worker["two_stage"] = two_stage  # (detect_scale, recognize_scale) or None for full-frame readtext
+
+
+def _process(path):
+    """OCR one image in a worker: (texts, timings) or raises."""
+    if "init_error" in _worker:
+        raise ReaderInitError(f"could not build the OCR reader: {_worker['init_error']}")
+    start = time.perf_counter()
+    image = cv2.imread(path)
+    if image is None:
+        raise ValueError("could not read image")
+    if _worker["two_stage"]:
+        read_done = time.perf_counter()
+        results = two_stage_readtext(_worker["reader"], image, *_worker["two_stage"])
+    else:
+        processed = preprocess_image(image)
+        read_done = time.perf_counter()
+        results = _worker["reader"].readtext(processed, detail=1, paragraph=False)
+    ocr_done = time.perf_counter()
+    texts = [{"text": text.strip(), "confidence": float(confidence),
+              "bbox": [[float(x), float(y)] for x, y in bbox], "language": detect_language(text.strip())}
+             for bbox, text, confidence in results if confidence > MIN_CONFIDENCE]
+    timings = {"read_seconds": read_done - start, "ocr_seconds": ocr_done - read_done,
+               "detect_seconds": time.perf_counter() - ocr_done}
+    return texts, timings
+
+
+def find_images(source):
+    """(path, key) of the images in a directory (recursive) or matching a glob; key is what the output records."""
+    if os.path.isdir(source):
+        for directory, _, names in sorted(os.walk(source)):
+            for name in sorted(names):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    path = os.path.join(directory, name)
+                    yield path, os.path.relpath(path, source)
+    else:
+        for path in sorted(glob.glob(source, recursive=True)):
+            if path.lower().endswith(IMAGE_EXTENSIONS):
+                yield path, path
+
+
+def ocr_directory(source, out_path, dest="es", translate=True, workers=None, threads=None, reader="easyocr",
+                  languages=("en",), translate_batch=TRANSLATE_BATCH, two_stage=None):
+    cpus = os.cpu_count() or 1
+    workers = workers or max(1, cpus // (threads or 1))
+    threads = threads or max(1, cpus // workers)
+    done = done_files(out_path)
+    images = [(path, key) for path, key in find_images(source) if key not in done]
+    print(f"{len(images)} images to process ({len(done)} already done), "
+          f"{workers} workers x {threads} threads on {cpus} cores")
+    client = None
+    if translate:
+        from translation_client import get_client
+        client = get_client()
+    max_pending = 4 * workers  # images in flight; bounds memory on large folders
+
+    start = time.perf_counter()
+    finished = errors = 0
+    batch = []
+    initargs = (reader, list(languages), threads, two_stage)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as pool, \
+            open(out_path, "a", encoding="utf-8") as out:
+        pending = deque()
+
+        def flush():
+            nonlocal finished
+            english = [item["text"] for record in batch for item in record["texts"] if item["language"] == "en"]
+            translate_start = time.perf_counter()
+            if client and english:
+                try:
+                    translated = dict(zip(english, client.translate_many(english, dest=dest, src="en")))
+                except Exception as e:
+                    translated = {text: f"[Translation Error: {str(e)}] {text}" for text in english}
+                for record in batch:
+                    for item in record["texts"]:
+                        if item["language"] == "en":
+                            item["translated"] = translated[item["text"]]
+            translate_seconds = (time.perf_counter() - translate_start) / max(len(batch), 1)
+            for record in batch:
+                record["timings"]["translate_seconds"] = translate_seconds  # this image's share of the batch
+                record["timings"] = {name: round(value, 4) for name, value in record["timings"].items()}
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            finished += len(batch)
+            batch.clear()
+            elapsed = time.perf_counter() - start
+            print(f"{finished}/{len(images)} images ({finished / elapsed:.1f} images/s so far)")
+
+        def collect(key, future):
+            nonlocal errors
+            try:
+                texts, timings = future.result()
+            except (ReaderInitError, BrokenProcessPool):
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+            except Exception as e:
+                errors += 1
+                print(f"{key}: skipped, {type(e).__name__}: {e}")
+                return
+            batch.append({"file": key, "texts": texts, "timings": timings})
+            if len(batch) >= translate_batch:
+                flush()
+
+        for path, key in images:
+            pending.append((key, pool.submit(_process, path)))
+            if len(pending) >= max_pending:
+                collect(*pending.popleft())
+        while pending:
+            collect(*pending.popleft())
+        if batch:
+            flush()
+
+    elapsed = time.perf_counter() - start
+    print(f"Done: {finished} images in {elapsed:.1f}s ({finished / max(elapsed, 1e-9):.1f} images/s), "
+          f"{errors} skipped -> {out_path}")
+    return finished, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="directory of images (searched recursively) or a glob pattern")
+    parser.add_argument("out", help="JSONL output; images already in it are skipped")
+    parser.add_argument("--dest", default="es", help="target language code")
+    parser.add_argument("--no-translate", action="store_true", help="OCR and language detection only")
+    parser.add_argument("--workers", type=int, help="processes (default: cores / threads)")
+    parser.add_argument("--threads", type=int, help="intra-op threads per worker (default: cores / workers)")
+    parser.add_argument("--reader", default="easyocr", help="easyocr or module:Class")
+    parser.add_argument("--languages", nargs="+", default=["en"], help="OCR languages")
+    parser.add_argument("--translate-batch", type=int, default=TRANSLATE_BATCH, help="images per translate call")
+    parser.add_argument("--two-stage", action="store_true",
+                        help="detect on a downscaled copy, preprocess and recognize only the text regions")
+    parser.add_argument("--detect-scale", type=float, default=DETECT_SCALE)
+    parser.add_argument("--recognize-scale", type=float, default=RECOGNIZE_SCALE)
+    args = parser.parse_args()
+    two_stage = (args.detect_scale, args.recognize_scale) if args.two_stage else None
+    ocr_directory(args.source, args.out, args.dest, not args.no_translate, args.workers, args.threads, args.reader,
+                  args.languages, args.translate_batch, two_stage)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,31 +3,33 @@ from tkinter import ttk, filedialog, messagebox, scrolledtext
 import cv2
 from PIL import Image, ImageTk, ImageEnhance
 import numpy as np
-import easyocr
-import langdetect
 from langdetect import DetectorFactory
-from googletrans import Translator, LANGUAGES  # FIXED: Added LANGUAGES
+from googletrans import LANGUAGES  # FIXED: Added LANGUAGES
+from translation_client import get_client
+from video_ocr import TextTracker, ocr_video
+from ocr_batch import detect_language, get_reader, preprocess_image
 import threading
+import time
 import os
 from pathlib import Path
 
 DetectorFactory.seed = 0
 
 class OCRTranslatorApp:
-    def __init__(self, root):
+    def __init__(self, root, reader_spec='easyocr', reader=None):
         self.root = root
         self.root.title("OCR Text Extractor & Translator")
         self.root.geometry("1000x700")
         self.root.configure(bg='#f0f0f0')
         
-        try:
-            self.ocr_reader = easyocr.Reader(['en'])  # English only
-        except Exception as e:
-            messagebox.showerror("OCR Error", f"Failed to initialize OCR: {e}\nMake sure EasyOCR is installed correctly.")
-            self.ocr_reader = None
-            return
+        # Unless a reader is passed in, it loads (and warms up) in the background; the window is usable meanwhile
+        self.reader_spec = reader_spec
+        self.ocr_reader = reader
+        self.ocr_state = 'loading' if reader is None else 'ready'
             
-        self.translator = Translator()
+        self.translator = get_client()
+        self.video_stats = None
+        self.stage_times = None
         self.supported_languages = {
             'Spanish': 'es',
             'French': 'fr',
@@ -42,6 +44,30 @@ class OCRTranslatorApp:
         }
         
         self.setup_gui()
+        if reader is None:
+            threading.Thread(target=self.load_reader, daemon=True).start()
+        else:
+            self.ocr_status_label.config(text="✅ OCR ready", foreground='green')
+        
+    def load_reader(self):
+        """Load the shared English reader off the Tk thread"""
+        start = time.perf_counter()
+        try:
+            reader = get_reader(self.reader_spec, ['en'])  # English only; warmed up, shared with other components
+        except Exception as e:
+            self.root.after(0, self.reader_failed, e)
+            return
+        self.root.after(0, self.reader_ready, reader, time.perf_counter() - start)
+        
+    def reader_ready(self, reader, seconds):
+        self.ocr_reader = reader
+        self.ocr_state = 'ready'
+        self.ocr_status_label.config(text=f"✅ OCR ready ({seconds:.1f}s)", foreground='green')
+        
+    def reader_failed(self, error):
+        self.ocr_state = 'failed'
+        self.ocr_status_label.config(text="❌ OCR failed to load", foreground='red')
+        messagebox.showerror("OCR Error", f"Failed to initialize OCR: {error}\nMake sure EasyOCR is installed correctly.")
         
     def setup_gui(self):
         main_frame = ttk.Frame(self.root, padding="10")
@@ -68,6 +94,9 @@ class OCRTranslatorApp:
                                        state='readonly', width=50)
         self.file_path_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 10), pady=5)
         
+        self.ocr_status_label = ttk.Label(input_frame, text="⏳ Loading OCR model...", foreground='orange')
+        self.ocr_status_label.grid(row=0, column=2, sticky=tk.E, pady=5)
+        
         self.preview_label = ttk.Label(input_frame, text="Preview will appear here")
         self.preview_label.grid(row=1, column=0, columnspan=2, pady=5)
         
@@ -161,19 +190,7 @@ class OCRTranslatorApp:
     
     def preprocess_image(self, image):
         """Preprocess image for better OCR results"""
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
-        
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-        enhanced = clahe.apply(gray)
-        
-        blurred = cv2.GaussianBlur(enhanced, (1, 1), 0)
-        
-        _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        
-        return thresh
+        return preprocess_image(image)
     
     def extract_text_from_image(self, image_path):
         """Extract text from image using EasyOCR"""
@@ -209,80 +226,38 @@ class OCRTranslatorApp:
             return [], "OCR not initialized"
             
         try:
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                return [], "Could not open video"
-            
-            extracted_texts = []
-            frame_count = 0
-            processed_frames = 0
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            # A decoder thread feeds sampled frames to the OCR thread; skipped frames are never retrieved.
+            # Detections are merged across frames, so text that stays on screen is reported once.
+            tracker = TextTracker()
             
-            frame_interval = 30
+            def track(frame_index, frame_results):
+                tracker.update(frame_index, [(bbox, text, confidence) for (bbox, text, confidence)
+                                             in frame_results if confidence > 0.6])
             
-            while cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                frame_count += 1
-                if frame_count % frame_interval != 0:
-                    continue
-                
-                processed_frame = self.preprocess_image(frame)
-                
-                results = self.ocr_reader.readtext(processed_frame, detail=1, paragraph=False)
-                
-                for (bbox, text, confidence) in results:
-                    if confidence > 0.6:
-                        extracted_texts.append({
-                            'text': text.strip(),
-                            'confidence': confidence,
-                            'bbox': bbox,
-                            'frame': frame_count
-                        })
-                
-                processed_frames += 1
-                if processed_frames % 10 == 0:
-                    self.root.after(0, lambda: self.progress['value'] + 1)
+            _, self.video_stats = ocr_video(
+                video_path,
+                lambda frame: self.ocr_reader.readtext(self.preprocess_image(frame), detail=1, paragraph=False),
+                on_frame=track, collect=False)
+            self.video_stats.update(tracker.stats())
             
-            cap.release()
+            extracted_texts = tracker.tracks(self.video_stats['fps'])
             return extracted_texts, None
             
         except Exception as e:
             return [], f"Video OCR Error: {str(e)}"
     
     def detect_language(self, text):
-        """Detect if text is English"""
-        try:
-            if len(text) < 3:
-                return 'unknown'
-            
-            detected = langdetect.detect(text)
-            return detected if detected == 'en' else 'non-english'
-            
-        except:
-            return 'unknown'
+        """Detect if text is English (memoized per whitespace-normalized string)"""
+        return detect_language(text)
     
-    def translate_text(self, text, target_lang):
-        """Translate English text to target language"""
+    def translate_texts(self, texts, target_lang):
+        """Translate English texts in batched calls (bounded concurrency in the client); returns {text: translation}"""
+        target_code = self.supported_languages.get(target_lang, 'es')
+        texts = [text for text in dict.fromkeys(texts) if text and len(text.strip()) >= 2]
         try:
-            if not text or len(text.strip()) < 2:
-                return text
-            
-            target_code = self.supported_languages.get(target_lang, 'es')
-            
-            # Detect if English first
-            lang = self.detect_language(text)
-            if lang != 'en':
-                return f"[Non-English detected: {lang}] {text}"
-            
-            # Translate
-            translated = self.translator.translate(text, src='en', dest=target_code)
-            return translated.text
-            
+            return dict(zip(texts, self.translator.translate_many(texts, src='en', dest=target_code)))
         except Exception as e:
-            return f"[Translation Error: {str(e)}] {text}"
+            return {text: f"[Translation Error: {str(e)}] {text}" for text in texts}
     
     def start_processing(self):
         """Start processing in a separate thread"""
@@ -290,6 +265,10 @@ class OCRTranslatorApp:
             messagebox.showwarning("No File", "Please select a file first!")
             return
         
+        if self.ocr_state == 'loading':
+            messagebox.showinfo("OCR Loading", "The OCR model is still loading, please try again in a moment.")
+            return
+        
         if not self.ocr_reader:
             messagebox.showerror("OCR Error", "OCR model not loaded. Please restart the application.")
             return
@@ -312,6 +291,8 @@ class OCRTranslatorApp:
         mode = self.mode_var.get()
         
         try:
+            self.video_stats = None
+            self.stage_times = None
             if mode == 'Image':
                 texts, error = self.extract_text_from_image(file_path)
             else:
@@ -321,27 +302,27 @@ class OCRTranslatorApp:
                 self.root.after(0, lambda: self.show_error(error))
                 return
             
-            # Process results
-            english_texts = []
-            translations = []
+            # Process results: detect each distinct text once, then translate the English ones in batches
+            start = time.perf_counter()
+            languages = {text: self.detect_language(text) for text in dict.fromkeys(item['text'] for item in texts)}
+            detect_seconds = time.perf_counter() - start
+            
+            # one entry per English block, for the counts and summary; translate_texts sends each distinct text once
+            english_texts = [item['text'] for item in texts if languages[item['text']] == 'en']
+            start = time.perf_counter()
+            translated = self.translate_texts(english_texts, target_lang)
+            translations = [translated.get(text, text) for text in english_texts]
+            self.stage_times = {'detect': detect_seconds, 'translate': time.perf_counter() - start}
             
             for item in texts:
                 original_text = item['text']
-                confidence = item['confidence']
-                
-                lang = self.detect_language(original_text)
+                lang = languages[original_text]
+                item['original'] = original_text
                 if lang == 'en':
-                    translated_text = self.translate_text(original_text, target_lang)
-                    english_texts.append(original_text)
-                    translations.append(translated_text)
-                    
-                    item['original'] = original_text
-                    item['translated'] = translated_text
-                    item['language'] = lang
+                    item['translated'] = translated.get(original_text, original_text)
                 else:
-                    item['original'] = original_text
                     item['translated'] = f"[Non-English: {lang}] {original_text}"
-                    item['language'] = lang
+                item['language'] = lang
             
             self.root.after(0, lambda: self.display_results(texts, english_texts, translations, target_lang))
             
@@ -377,6 +358,9 @@ class OCRTranslatorApp:
             lang = item.get('language', 'unknown')
             
             self.results_text.insert(tk.END, f"[{i}] Confidence: {confidence:.1%}\n")
+            if 'start' in item:
+                self.results_text.insert(tk.END, f"On screen: {item['start']:.1f}s - {item['end']:.1f}s "
+                                                 f"({item['frames']} OCR'd frames)\n")
             self.results_text.insert(tk.END, f"Language: {lang}\n")
             self.results_text.insert(tk.END, f"Original: {original}\n")
             
@@ -391,6 +375,12 @@ class OCRTranslatorApp:
                 self.results_text.insert(tk.END, f"{i}. {orig} → {trans}\n")
         
         stats = f"📊 Stats: {len(texts)} blocks | {len(english_texts)} English | {len(english_texts)/max(len(texts),1)*100:.0f}% success"
+        if self.video_stats:
+            stats += (f" | OCR on {self.video_stats['ocr_calls']}/{self.video_stats['frames']} frames"
+                      f" | {self.video_stats['detections']} detections -> {self.video_stats['tracks']} tracks")
+        if self.stage_times:
+            stats += (f" | detect {self.stage_times['detect'] * 1000:.0f} ms"
+                      f", translate {self.stage_times['translate'] * 1000:.0f} ms")
         self.stats_label.config(text=stats)
     
     def show_error(self, error_msg):
@@ -0,0 +1,16 @@
+"""
+Long English words (10+ characters, the dual translator's filter rule) shared by the benchmarks.
+
+Kept free of imports so load generators can use it without pulling in torch or transformers.
+"""
+
+LONG_WORDS = [
+    "information", "development", "international", "environment", "government", "technology",
+    "management", "university", "relationship", "performance", "understanding", "communication",
+    "organization", "responsibility", "opportunity", "engineering", "experience", "particularly",
+    "independent", "application", "competition", "temperature", "electricity", "photography",
+    "preparation", "restaurant", "collection", "television", "population", "investment",
+    "background", "successful", "statistics", "atmosphere", "conference", "definitely",
+    "generation", "historical", "illustrate", "literature", "mathematics", "negotiation",
+    "philosophy", "profession", "reputation", "significant", "transportation", "vocabulary",
+]
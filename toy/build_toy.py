@@ -0,0 +1,133 @@
+"""
+Rebuild the bundled toy English -> French model and corpus used by `1.py evaluate`.
+
+The corpus is generated from a tiny grammar (adjectives follow the noun on the
+French side, so the model has to learn some reordering), and a small
+Encoder / AttentionDecoder is trained on it for a few minutes of CPU time.
+
+    python toy/build_toy.py
+    python 1.py evaluate --checkpoint toy/model_checkpoint.pth --src toy/test.en --ref toy/test.fr
+"""
+import importlib.util
+import os
+import random
+
+import torch
+import torch.nn.functional as F
+
+TOY_DIR = os.path.dirname(os.path.abspath(__file__))
+NMT_PATH = os.path.join(TOY_DIR, os.pardir, "1.py")
+
+DETERMINERS = {"the": "le", "a": "un", "this": "ce", "every": "chaque"}
+ADJECTIVES = {"big": "grand", "small": "petit", "red": "rouge", "green": "vert", "old": "vieux",
+              "young": "jeune", "happy": "heureux", "strange": "etrange", "black": "noir", "white": "blanc"}
+NOUNS = {"cat": "chat", "dog": "chien", "car": "camion", "house": "batiment", "friend": "ami",
+         "teacher": "professeur", "garden": "jardin", "book": "livre", "bird": "oiseau", "horse": "cheval",
+         "boat": "bateau", "tree": "arbre"}
+VERBS = {"sees": "voit", "likes": "aime", "follows": "suit", "finds": "trouve", "paints": "peint",
+         "watches": "regarde", "hears": "entend", "draws": "dessine"}
+CONJUNCTIONS = {"and": "et", "but": "mais"}
+
+SPECIALS = ["<pad>", "<sos>", "<eos>", "<unk>"]
+CONFIG = {"emb_dim": 64, "hid_dim": 128, "num_layers": 1}
+
+
+def load_nmt():
+    spec = importlib.util.spec_from_file_location("nmt", NMT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def noun_phrase(rng):
+    det = rng.choice(list(DETERMINERS))
+    noun = rng.choice(list(NOUNS))
+    if rng.random() < 0.6:
+        adj = rng.choice(list(ADJECTIVES))
+        return [det, adj, noun], [DETERMINERS[det], NOUNS[noun], ADJECTIVES[adj]]
+    return [det, noun], [DETERMINERS[det], NOUNS[noun]]
+
+
+def clause(rng):
+    subj_en, subj_fr = noun_phrase(rng)
+    verb = rng.choice(list(VERBS))
+    obj_en, obj_fr = noun_phrase(rng)
+    return subj_en + [verb] + obj_en, subj_fr + [VERBS[verb]] + obj_fr
+
+
+def sentence(rng):
+    en, fr = clause(rng)
+    if rng.random() < 0.35:
+        conj = rng.choice(list(CONJUNCTIONS))
+        en2, fr2 = clause(rng)
+        en, fr = en + [conj] + en2, fr + [CONJUNCTIONS[conj]] + fr2
+    return en, fr
+
+
+def write_corpus(name, pairs):
+    with open(os.path.join(TOY_DIR, f"{name}.en"), "w", encoding="utf-8") as en_file, \
+            open(os.path.join(TOY_DIR, f"{name}.fr"), "w", encoding="utf-8") as fr_file:
+        for en, fr in pairs:
+            en_file.write(" ".join(en) + "\n")
+            fr_file.write(" ".join(fr) + "\n")
+
+
+def train(nmt, pairs, src_vocab, tgt_vocab, epochs=12, batch_size=64):
+    torch.manual_seed(0)
+    pad_id, sos_id, eos_id = (tgt_vocab.stoi[t] for t in (nmt.PAD_TOKEN, nmt.SOS_TOKEN, nmt.EOS_TOKEN))
+    encoder = nmt.Encoder(len(src_vocab.itos), CONFIG["emb_dim"], CONFIG["hid_dim"], pad_id=pad_id)
+    decoder = nmt.AttentionDecoder(len(tgt_vocab.itos), CONFIG["emb_dim"], CONFIG["hid_dim"], pad_id=pad_id)
+    optimizer = torch.optim.Adam(list(encoder.parameters()) + list(decoder.parameters()), lr=3e-3)
+    rng = random.Random(0)
+
+    for epoch in range(epochs):
+        rng.shuffle(pairs)
+        total = 0.0
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start:start + batch_size]
+            src = [src_vocab.encode(en) for en, _ in batch]
+            tgt = [[sos_id] + tgt_vocab.encode(fr) + [eos_id] for _, fr in batch]
+            src_len = torch.tensor([len(s) for s in src])
+            src_batch = torch.full((len(batch), int(src_len.max())), pad_id, dtype=torch.long)
+            tgt_batch = torch.full((len(batch), max(len(t) for t in tgt)), pad_id, dtype=torch.long)
+            for i, (s, t) in enumerate(zip(src, tgt)):
+                src_batch[i, :len(s)] = torch.tensor(s)
+                tgt_batch[i, :len(t)] = torch.tensor(t)
+            src_mask = torch.arange(src_batch.size(1)).unsqueeze(0) < src_len.unsqueeze(1)
+
+            encoder_outputs, hidden = encoder(src_batch, src_len)
+            loss = 0.0
+            for t in range(tgt_batch.size(1) - 1):
+                logits, hidden, _ = decoder.step(tgt_batch[:, t], hidden, encoder_outputs, src_mask=src_mask)
+                loss = loss + F.cross_entropy(logits, tgt_batch[:, t + 1], ignore_index=pad_id)
+            loss = loss / (tgt_batch.size(1) - 1)
+            optimizer.zero_grad()
+            loss.backward()
+            torch.nn.utils.clip_grad_norm_(list(encoder.parameters()) + list(decoder.parameters()), 1.0)
+            optimizer.step()
+            total += loss.item() * len(batch)
+        print(f"epoch {epoch + 1}: loss {total / len(pairs):.4f}")
+    return encoder, decoder
+
+
+def main():
+    nmt = load_nmt()
+    rng = random.Random(1234)
+    train_pairs = [sentence(rng) for _ in range(4000)]
+    test_pairs = [sentence(rng) for _ in range(200)]
+    write_corpus("train", train_pairs)
+    write_corpus("test", test_pairs)
+
+    src_words = sorted({w for en, _ in train_pairs for w in en})
+    tgt_words = sorted({w for _, fr in train_pairs for w in fr})
+    src_vocab = nmt.vocab_from_itos(SPECIALS + src_words)
+    tgt_vocab = nmt.vocab_from_itos(SPECIALS + tgt_words)
+
+    encoder, decoder = train(nmt, list(train_pairs), src_vocab, tgt_vocab)
+    nmt.save_checkpoint(os.path.join(TOY_DIR, "model_checkpoint.pth"), encoder, decoder,
+                        src_vocab, tgt_vocab, CONFIG)
+    print(f"wrote {TOY_DIR}/model_checkpoint.pth")
+
+
+if __name__ == "__main__":
+    main()
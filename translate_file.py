@@ -0,0 +1,168 @@
+"""
+Streaming bulk-file mode for the dual translator.
+
+Reads a text file line by line, keeps the 10+ character words (the GUI's
+filter rule), translates them in chunks through translation_engine and appends
+one row per word to a JSONL or CSV file (null where a word, or a whole
+language whose model failed, could not be translated). Memory stays bounded by
+--chunk-words and --max-read-bytes whatever the input size: a line longer than
+--max-read-bytes (or a file with no newlines) is read in pieces cut at
+whitespace, and its words may span chunks.
+
+After every chunk the output is flushed and a checkpoint (input byte offset,
+line number and output size) is written next to it. Re-running the same command
+resumes from there: the output is truncated to the checkpointed size, dropping
+any partial chunk, and reading continues at the checkpointed offset.
+
+    python translate_file.py big.txt translations.jsonl [--langs French Hindi] [--format csv]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import time
+
+from translation_engine import (BACKENDS, CACHE_PATH, DEFAULT_LANGS, MODEL_CATALOG, TranslationEngine,
+                                filter_words_by_length)
+
+CHUNK_WORDS = 512
+MAX_READ_BYTES = 1 << 20  # longest piece of a line read at once
+PROGRESS_SECONDS = 10
+
+
+def read_checkpoint(path):
+    if not os.path.exists(path):
+        return {"offset": 0, "line": 0, "output_size": 0, "words": 0}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_checkpoint(path, checkpoint):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+def format_rows(rows, fmt, langs):
+    if fmt == "jsonl":
+        return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, ["line", "word"] + langs, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
+
+
+def read_pieces(f, max_bytes=MAX_READ_BYTES):
+    """Yield (bytes, ends_line) pieces of at most max_bytes, so an over-long line is never read whole.
+
+    A line longer than max_bytes is cut at its last space or tab within the limit
+    (mid-word only if there is none), and the rest is read as the next piece.
+    """
+    while True:
+        piece = f.readline(max_bytes)
+        if not piece:
+            return
+        if piece.endswith(b"\n") or len(piece) < max_bytes:
+            yield piece, True
+            continue
+        cut = max(piece.rfind(b" "), piece.rfind(b"\t")) + 1
+        if 0 < cut < len(piece):
+            f.seek(cut - len(piece), os.SEEK_CUR)
+            piece = piece[:cut]
+        yield piece, False
+
+
+def chunks(f, start_line, chunk_words, max_bytes=MAX_READ_BYTES):
+    """Yield ([(line number, long words)], end byte offset, complete lines) with about chunk_words words each.
+
+    Over-long lines are read in pieces (see read_pieces), so their words can span chunks.
+    """
+    lines, n_words, line_no = [], 0, start_line
+    for piece, ends_line in read_pieces(f, max_bytes):
+        long_words, _ = filter_words_by_length(piece.decode("utf-8", errors="replace"))
+        if long_words:
+            lines.append((line_no + 1, long_words))
+            n_words += len(long_words)
+        line_no += ends_line
+        if n_words >= chunk_words:
+            yield lines, f.tell(), line_no
+            lines, n_words = [], 0
+    if lines or line_no > start_line:
+        yield lines, f.tell(), line_no
+
+
+def translate_file(engine, src_path, out_path, langs, fmt="jsonl", chunk_words=CHUNK_WORDS,
+                   checkpoint_path=None, progress_seconds=PROGRESS_SECONDS, max_read_bytes=MAX_READ_BYTES):
+    checkpoint_path = checkpoint_path or out_path + ".ckpt"
+    checkpoint = read_checkpoint(checkpoint_path)
+    total_bytes = os.path.getsize(src_path)
+    if checkpoint["offset"]:
+        print(f"Resuming at line {checkpoint['line']} (byte {checkpoint['offset']} of {total_bytes})")
+
+    mode = "r+" if os.path.exists(out_path) else "w"
+    with open(src_path, "rb") as src, open(out_path, mode, encoding="utf-8", newline="") as out:
+        out.truncate(checkpoint["output_size"])
+        out.seek(checkpoint["output_size"])
+        if fmt == "csv" and checkpoint["output_size"] == 0:
+            out.write(",".join(["line", "word"] + langs) + "\n")
+        src.seek(checkpoint["offset"])
+
+        start = last_report = time.perf_counter()
+        words_done = 0
+        for lines, offset, line_no in chunks(src, checkpoint["line"], chunk_words, max_read_bytes):
+            words = [word for _, line_words in lines for word in line_words]
+            errors = {}
+            results = engine.translate(list(dict.fromkeys(words)), langs,
+                                       on_error=lambda lang, e: errors.__setitem__(lang, e)) if words else {}
+            for lang, error in errors.items():  # the other languages are still written
+                print(f"{lang} failed for lines {checkpoint['line'] + 1}-{line_no}, written as null: "
+                      f"{type(error).__name__}: {error}")
+                results[lang] = {}
+            rows = [dict({"line": n, "word": word}, **{lang: results[lang].get(word) for lang in langs})
+                    for n, line_words in lines for word in line_words]
+            out.write(format_rows(rows, fmt, langs))
+            out.flush()
+            os.fsync(out.fileno())
+            words_done += len(words)
+            checkpoint = {"offset": offset, "line": line_no, "output_size": out.tell(),
+                          "words": checkpoint["words"] + len(words)}
+            write_checkpoint(checkpoint_path, checkpoint)
+
+            now = time.perf_counter()
+            if now - last_report >= progress_seconds:
+                last_report = now
+                print(f"line {line_no}: {offset / max(total_bytes, 1):.1%} of input, "
+                      f"{checkpoint['words']} words, {words_done / (now - start):.1f} words/sec")
+
+    elapsed = time.perf_counter() - start
+    print(f"Done: {checkpoint['line']} lines, {checkpoint['words']} words "
+          f"({words_done} this run, {words_done / max(elapsed, 1e-9):.1f} words/sec) -> {out_path}")
+    return checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("src")
+    parser.add_argument("out")
+    parser.add_argument("--langs", nargs="+", default=DEFAULT_LANGS, choices=list(MODEL_CATALOG))
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="default: from the output extension")
+    parser.add_argument("--chunk-words", type=int, default=CHUNK_WORDS, help="words translated per checkpoint")
+    parser.add_argument("--max-read-bytes", type=int, default=MAX_READ_BYTES,
+                        help="longer lines are read in pieces of at most this size, cut at whitespace")
+    parser.add_argument("--checkpoint", help="default: OUT.ckpt")
+    parser.add_argument("--progress-seconds", type=float, default=PROGRESS_SECONDS)
+    parser.add_argument("--backend", choices=BACKENDS, default="eager")
+    parser.add_argument("--greedy", action="store_true", help="greedy decoding (num_beams=1), the fast mode")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.out.lower().endswith(".csv") else "jsonl")
+    engine = TranslationEngine(cache_path=None if args.no_cache else CACHE_PATH, default_langs=args.langs,
+                               backend=args.backend, greedy=args.greedy)
+    translate_file(engine, args.src, args.out, args.langs, fmt, args.chunk_words, args.checkpoint,
+                   args.progress_seconds, args.max_read_bytes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Shared translation client used by the OCR translator, the voice translator and the notebooks.
+
+One client per process (get_client()) keeps its backend connections open and
+reuses them. Many strings are merged into a few batched requests: duplicates
+are sent once, and texts are grouped up to max_batch_items / max_batch_chars.
+Batches run with bounded concurrency and are retried with exponential backoff
+on transient failures (connection errors, timeouts, HTTP 429 and 5xx); other
+errors propagate at once. Every backend call's latency is recorded.
+
+Backends:
+    GoogleBackend  one shared googletrans.Translator (its HTTP client is the pool);
+                   a batch is sent as one newline-joined text, and sent one text per
+                   call if the reply does not have one line per input
+    HttpBackend    LibreTranslate-style JSON API ({"q": [...], "source", "target"}
+                   -> {"translatedText": [...]}) over pooled keep-alive connections,
+                   e.g. mock_translation_server.py for offline throughput tests
+
+get_client() uses HttpBackend when TRANSLATION_API_URL is set, GoogleBackend otherwise.
+
+    client = get_client()
+    client.translate("hello", dest="hi")
+    client.translate_many(texts, dest="fr", src="en")
+    await client.atranslate_many(texts, dest="fr")
+"""
+import asyncio
+import http.client
+import inspect
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+MAX_BATCH_ITEMS = 64
+MAX_BATCH_CHARS = 4000
+CONCURRENCY = 4
+RETRIES = 3
+BACKOFF_SECONDS = 0.5
+TIMEOUT_SECONDS = 10
+LATENCY_WINDOW = 1000
+
+
+class TransientError(Exception):
+    """A failure worth retrying (connection problem, 429 or 5xx)."""
+
+
+class GoogleBackend:
+    SEPARATOR = "\n"
+    STATUS = re.compile(r'status code "?(\d{3})')  # googletrans reports HTTP errors as a bare Exception
+
+    def __init__(self):
+        from googletrans import Translator
+        # with raise_exception, a 429 / 5xx raises instead of silently returning the input text
+        kwargs = {"raise_exception": True} if "raise_exception" in inspect.signature(Translator).parameters else {}
+        self.translator = Translator(**kwargs)
+        self.transient = (OSError, http.client.HTTPException)
+        try:
+            import httpx
+            self.transient += tuple(getattr(httpx, name) for name in ("TransportError", "NetworkError",
+                                                                      "TimeoutException") if hasattr(httpx, name))
+        except ImportError:
+            pass
+        self.loop = None
+        if inspect.iscoroutinefunction(self.translator.translate):
+            # googletrans >= 4.0.1 is async-only: keep one loop (and so one connection pool) alive for it
+            self.loop = asyncio.new_event_loop()
+            threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def _call(self, text, src, dest):
+        if self.loop is not None:
+            coroutine = self.translator.translate(text, src=src, dest=dest)
+            return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result().text
+        return self.translator.translate(text, src=src, dest=dest).text
+
+    def is_transient(self, error):
+        """Connection errors, timeouts, HTTP 429 and 5xx; anything else is not worth retrying."""
+        if isinstance(error, self.transient):
+            return True
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+        if status is None:
+            match = self.STATUS.search(str(error))
+            status = int(match.group(1)) if match else None
+        return status is not None and (status == 429 or status >= 500)
+
+    def translate_batch(self, texts, src, dest):
+        try:
+            if len(texts) > 1 and not any(self.SEPARATOR in text for text in texts):
+                parts = self._call(self.SEPARATOR.join(texts), src, dest).split(self.SEPARATOR)
+                if len(parts) == len(texts):
+                    return [part.strip() for part in parts]
+            # one text, or the service merged or split lines: one call each
+            return [self._call(text, src, dest) for text in texts]
+        except Exception as e:
+            if self.is_transient(e):
+                raise TransientError(f"{type(e).__name__}: {e}") from e
+            raise
+
+
+class HttpBackend:
+    def __init__(self, url, pool_size=CONCURRENCY, timeout=TIMEOUT_SECONDS):
+        parts = urlsplit(url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = (parts.path.rstrip("/") or "") + "/translate"
+        self.timeout = timeout
+        self.pool = queue.LifoQueue(pool_size)
+        self.connections_opened = 0
+
+    def _connection(self):
+        try:
+            return self.pool.get_nowait()
+        except queue.Empty:
+            self.connections_opened += 1
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            return cls(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, connection):
+        try:
+            self.pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def translate_batch(self, texts, src, dest):
+        body = json.dumps({"q": texts, "source": src, "target": dest}).encode("utf-8")
+        connection = self._connection()
+        try:
+            connection.request("POST", self.path, body, {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            connection.close()
+            raise TransientError(f"{type(e).__name__}: {e}") from e
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(connection)
+        if response.status == 429 or response.status >= 500:
+            raise TransientError(f"HTTP {response.status}")
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}: {data[:200].decode('utf-8', 'replace')}")
+        translated = json.loads(data)["translatedText"]
+        if len(translated) != len(texts):
+            raise RuntimeError(f"expected {len(texts)} translations, got {len(translated)}")
+        return translated
+
+
+class TranslationClient:
+    def __init__(self, backend, max_batch_items=MAX_BATCH_ITEMS, max_batch_chars=MAX_BATCH_CHARS,
+                 concurrency=CONCURRENCY, retries=RETRIES, backoff=BACKOFF_SECONDS):
+        self.backend = backend
+        self.max_batch_items = max_batch_items
+        self.max_batch_chars = max_batch_chars
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="translation-client")
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.calls = self.retried = self.failures = self.items = 0
+
+    def batches(self, texts):
+        batch, chars = [], 0
+        for text in texts:
+            if batch and (len(batch) >= self.max_batch_items or chars + len(text) > self.max_batch_chars):
+                yield batch
+                batch, chars = [], 0
+            batch.append(text)
+            chars += len(text)
+        if batch:
+            yield batch
+
+    def _call(self, batch, src, dest):
+        """One backend call with retry/backoff; records its latency."""
+        for attempt in range(self.retries + 1):
+            start = time.perf_counter()
+            try:
+                result = self.backend.translate_batch(batch, src, dest)
+            except TransientError:
+                with self.lock:
+                    self.retried += attempt < self.retries
+                    self.failures += attempt == self.retries
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+                continue
+            with self.lock:
+                self.latencies.append(time.perf_counter() - start)
+                self.calls += 1
+                self.items += len(batch)
+            return result
+
+    def translate(self, text, dest="en", src="auto"):
+        return self.translate_many([text], dest, src)[0]
+
+    def translate_many(self, texts, dest="en", src="auto"):
+        """Translate texts (order kept); blank strings are returned unchanged."""
+        unique = list(dict.fromkeys(text for text in texts if text.strip()))
+        translated = {}
+        futures = [(batch, self.executor.submit(self._call, batch, src, dest)) for batch in self.batches(unique)]
+        for batch, future in futures:
+            translated.update(zip(batch, future.result()))
+        return [translated.get(text, text) for text in texts]
+
+    async def atranslate(self, text, dest="en", src="auto"):
+        return (await self.atranslate_many([text], dest, src))[0]
+
+    async def atranslate_many(self, texts, dest="en", src="auto"):
+        loop = asyncio.get_running_loop()
+        unique = list(dict.fromkeys(text for text in texts if text.strip()))
+        batches = list(self.batches(unique))
+        # the executor has `concurrency` workers, which bounds the calls in flight
+        results = await asyncio.gather(*(loop.run_in_executor(self.executor, self._call, batch, src, dest)
+                                         for batch in batches))
+        translated = {}
+        for batch, result in zip(batches, results):
+            translated.update(zip(batch, result))
+        return [translated.get(text, text) for text in texts]
+
+    def stats(self):
+        """Call counts and per-call latency (ms) over the last LATENCY_WINDOW calls."""
+        with self.lock:
+            latencies = sorted(self.latencies)
+            stats = {"calls": self.calls, "items": self.items, "retries": self.retried, "failures": self.failures}
+        if latencies:
+            stats.update(p50_ms=latencies[len(latencies) // 2] * 1000,
+                         p95_ms=latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000)
+        return stats
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide shared client (created on first use)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            url = os.environ.get("TRANSLATION_API_URL")
+            _client = TranslationClient(HttpBackend(url) if url else GoogleBackend())
+        return _client
@@ -0,0 +1,404 @@
+"""
+GUI-independent MarianMT translation engine shared by the Tk translator and
+translation_service.py: the model registry, the word cache and batched generation.
+"""
+import functools
+import gc
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+from transformers import MarianMTModel, MarianTokenizer
+
+MODEL_CATALOG = {
+    'French': 'Helsinki-NLP/opus-mt-en-fr',
+    'Hindi': 'Helsinki-NLP/opus-mt-en-hi',
+    'German': 'Helsinki-NLP/opus-mt-en-de',
+    'Spanish': 'Helsinki-NLP/opus-mt-en-es',
+    'Italian': 'Helsinki-NLP/opus-mt-en-it',
+    'Dutch': 'Helsinki-NLP/opus-mt-en-nl',
+    'Russian': 'Helsinki-NLP/opus-mt-en-ru',
+    'Chinese': 'Helsinki-NLP/opus-mt-en-zh',
+    'Arabic': 'Helsinki-NLP/opus-mt-en-ar',
+    'Swedish': 'Helsinki-NLP/opus-mt-en-sv',
+    'Finnish': 'Helsinki-NLP/opus-mt-en-fi',
+    'Danish': 'Helsinki-NLP/opus-mt-en-da',
+    'Czech': 'Helsinki-NLP/opus-mt-en-cs',
+    'Ukrainian': 'Helsinki-NLP/opus-mt-en-uk',
+    'Indonesian': 'Helsinki-NLP/opus-mt-en-id',
+    'Vietnamese': 'Helsinki-NLP/opus-mt-en-vi',
+    'Urdu': 'Helsinki-NLP/opus-mt-en-ur',
+    'Marathi': 'Helsinki-NLP/opus-mt-en-mr',
+}
+DEFAULT_LANGS = ['French', 'Hindi']
+SUPPORTED_LANGS = {lang: MODEL_CATALOG[lang] for lang in DEFAULT_LANGS}
+RSS_BUDGET_MB = 4096
+
+MAX_BATCH_SIZE = 32
+FIRST_BATCH_SIZE = 4
+GENERATION_KWARGS = {'max_length': 50, 'use_cache': True}
+GREEDY_KWARGS = {'num_beams': 1, 'do_sample': False}
+BACKENDS = ('eager', 'int8', 'compiled')
+CACHE_PATH = 'translation_cache.sqlite3'
+CACHE_MEMORY_ENTRIES = 10000
+MIN_WORD_LENGTH = 10
+WORD_RE = re.compile(r'\b\w+\b')
+
+
+class TranslationCache:
+    """Two-tier word translation cache: a bounded in-memory LRU in front of SQLite.
+
+    Entries are keyed by (model name, source word, generation settings). Rows of
+    models not in model_names are deleted when the cache is opened, so renaming
+    or swapping a model invalidates its old translations.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=CACHE_MEMORY_ENTRIES, model_names=None):
+        self.max_entries = max_entries
+        self.memory = OrderedDict()
+        self.memory_hits = self.disk_hits = self.misses = self.evictions = 0
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS translations (model TEXT, settings TEXT, word TEXT, "
+                        "translation TEXT, PRIMARY KEY (model, settings, word))")
+        if model_names is not None:
+            model_names = list(model_names)
+            placeholders = ", ".join("?" * len(model_names))
+            self.db.execute(f"DELETE FROM translations WHERE model NOT IN ({placeholders})", model_names)
+        self.db.commit()
+
+    @staticmethod
+    def settings_key(settings):
+        return json.dumps(settings, sort_keys=True)
+
+    def get_many(self, model_name, words, settings=GENERATION_KWARGS):
+        """Return a dict word -> translation for the words found in either tier."""
+        settings = self.settings_key(settings)
+        found = {}
+        with self.lock:
+            for word in dict.fromkeys(words):
+                key = (model_name, settings, word)
+                if key in self.memory:
+                    self.memory.move_to_end(key)
+                    found[word] = self.memory[key]
+                    self.memory_hits += 1
+                    continue
+                row = self.db.execute("SELECT translation FROM translations WHERE model = ? AND settings = ? "
+                                      "AND word = ?", key).fetchone()
+                if row is None:
+                    self.misses += 1
+                else:
+                    found[word] = row[0]
+                    self.disk_hits += 1
+                    self._remember(key, row[0])
+        return found
+
+    def put_many(self, model_name, translations, settings=GENERATION_KWARGS):
+        """Store word -> translation pairs in both tiers."""
+        settings = self.settings_key(settings)
+        with self.lock:
+            self.db.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)",
+                                [(model_name, settings, word, text) for word, text in translations.items()])
+            self.db.commit()
+            for word, text in translations.items():
+                self._remember((model_name, settings, word), text)
+
+    def _remember(self, key, translation):
+        self.memory[key] = translation
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        return {'memory_hits': self.memory_hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                'evictions': self.evictions, 'memory_entries': len(self.memory)}
+
+
+def filter_words_by_length(text, min_length=MIN_WORD_LENGTH):
+    """Split text into (long_words, short_words); only long words are translated."""
+    words = WORD_RE.findall(text)
+    long_words = [word for word in words if len(word) >= min_length]
+    short_words = [word for word in words if len(word) < min_length]
+    return long_words, short_words
+
+
+def translate_words(tokenizer, model, words, max_batch_size=MAX_BATCH_SIZE, on_batch=None,
+                    first_batch_size=FIRST_BATCH_SIZE, generation_kwargs=GENERATION_KWARGS):
+    """Translate words with one batched generate call per batch of unique words.
+
+    Returns a dict word -> translation (None if that word failed). Duplicates are
+    translated once, and words are batched shortest-first so padding stays small.
+    Batches start at first_batch_size words and double up to max_batch_size, so
+    the first results are ready quickly; on_batch, if given, is called with each
+    batch's dict as soon as it is done. If a batch fails, its words are retried
+    one at a time so that only the offending words are reported as errors.
+    """
+    unique = sorted(set(words), key=len)
+    translated = {}
+    start, size = 0, min(first_batch_size, max_batch_size)
+    while start < len(unique):
+        batch = unique[start:start + size]
+        try:
+            done = dict(zip(batch, _generate(tokenizer, model, batch, generation_kwargs)))
+        except Exception:
+            done = {}
+            for word in batch:
+                try:
+                    done[word] = _generate(tokenizer, model, [word], generation_kwargs)[0]
+                except Exception:
+                    done[word] = None
+        translated.update(done)
+        if on_batch is not None:
+            on_batch(done)
+        start, size = start + size, min(size * 2, max_batch_size)
+    return translated
+
+
+def _generate(tokenizer, model, batch, generation_kwargs):
+    inputs = tokenizer(batch, return_tensors="pt", padding=True)
+    with torch.inference_mode():
+        outputs = model.generate(**inputs, **generation_kwargs)
+    return tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+
+def rss_mb():
+    """Resident set size of this process in MB (Linux /proc; 0 elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return 0.0
+
+
+def load_marian(model_name, backend='eager'):
+    """Load a tokenizer and model for the given inference backend.
+
+    eager: plain fp32. int8: Linear layers dynamically quantized in place (CPU).
+    compiled: forward compiled with torch.compile (dynamic shapes), so the
+    per-step decoder calls inside generate run as a fused graph after warm-up.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+    tokenizer = MarianTokenizer.from_pretrained(model_name)
+    model = MarianMTModel.from_pretrained(model_name).eval()
+    if backend == 'int8':
+        torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    elif backend == 'compiled':
+        model.forward = torch.compile(model.forward, dynamic=True)
+    return tokenizer, model
+
+
+class ModelRegistry:
+    """Lazily loaded models, kept least-recently-used under an RSS budget.
+
+    get(lang) loads a model on first use; concurrent first uses of the same
+    language wait for that one load instead of starting their own. After a load,
+    if process RSS exceeds rss_budget_mb, the least recently used other models
+    are dropped until their recorded footprints bring it back under budget.
+    state(lang) is 'unloaded', 'loading', 'ready' or 'failed'.
+    """
+
+    def __init__(self, catalog=MODEL_CATALOG, rss_budget_mb=RSS_BUDGET_MB, loader=load_marian):
+        self.catalog = dict(catalog)
+        self.rss_budget_mb = rss_budget_mb
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.loaded = OrderedDict()  # lang -> (tokenizer, model), least recently used first
+        self.loading = {}  # lang -> threading.Event set when the load finishes
+        self.errors = {}
+        self.info = {lang: {'hits': 0, 'loads': 0, 'evictions': 0, 'load_seconds': None, 'params_mb': None,
+                            'rss_mb': None} for lang in self.catalog}
+
+    def state(self, lang):
+        with self.lock:
+            if lang in self.loaded:
+                return 'ready'
+            if lang in self.loading:
+                return 'loading'
+            return 'failed' if lang in self.errors else 'unloaded'
+
+    def states(self):
+        return {lang: self.state(lang) for lang in self.catalog}
+
+    def ready_langs(self):
+        with self.lock:
+            return [lang for lang in self.catalog if lang in self.loaded]
+
+    def get(self, lang):
+        """Return (tokenizer, model) for lang, loading it if needed."""
+        if lang not in self.catalog:
+            raise KeyError(f"no model registered for {lang}")
+        with self.lock:
+            if lang in self.loaded:
+                self.loaded.move_to_end(lang)
+                self.info[lang]['hits'] += 1
+                return self.loaded[lang]
+            event = self.loading.get(lang)
+            owner = event is None
+            if owner:
+                event = self.loading[lang] = threading.Event()
+                self.errors.pop(lang, None)
+        if not owner:
+            event.wait()
+            with self.lock:
+                if lang in self.loaded:
+                    self.info[lang]['hits'] += 1
+                    return self.loaded[lang]
+                raise RuntimeError(f"loading {lang} failed: {self.errors.get(lang)}")
+        try:
+            return self._load(lang)
+        finally:
+            with self.lock:
+                del self.loading[lang]
+            event.set()
+
+    def _load(self, lang):
+        rss_before = rss_mb()
+        start = time.perf_counter()
+        try:
+            entry = self.loader(self.catalog[lang])
+        except Exception as e:
+            with self.lock:
+                self.errors[lang] = e
+            raise
+        info = self.info[lang]
+        info['load_seconds'] = time.perf_counter() - start
+        info['params_mb'] = sum(p.numel() * p.element_size() for p in entry[1].parameters()) / 2 ** 20
+        info['rss_mb'] = max(rss_mb() - rss_before, 0.0)
+        with self.lock:
+            info['loads'] += 1
+            self.loaded[lang] = entry
+            self._evict(keep=lang)
+        return entry
+
+    def _evict(self, keep):
+        over = rss_mb() - self.rss_budget_mb
+        for lang in list(self.loaded):
+            if over <= 0:
+                break
+            if lang == keep:
+                continue
+            del self.loaded[lang]
+            self.info[lang]['evictions'] += 1
+            over -= max(self.info[lang]['rss_mb'] or 0.0, self.info[lang]['params_mb'] or 0.0)
+        gc.collect()
+
+    def stats(self):
+        """Per-model state, load time, memory footprint and hit rate."""
+        with self.lock:
+            stats = {}
+            for lang, info in self.info.items():
+                uses = info['hits'] + info['loads']
+                stats[lang] = dict(info, hit_rate=info['hits'] / uses if uses else None)
+        for lang in stats:
+            stats[lang]['state'] = self.state(lang)
+        return stats
+
+
+class TranslationEngine:
+    """Model registry plus the word cache, usable from any thread.
+
+    Intra-op threads are set on whichever thread runs a language's pipeline
+    (under OpenMP the count is per calling thread), so languages translated
+    concurrently split the cores instead of oversubscribing them.
+    """
+
+    def __init__(self, catalog=MODEL_CATALOG, cache_path=CACHE_PATH, max_batch_size=MAX_BATCH_SIZE,
+                 rss_budget_mb=RSS_BUDGET_MB, default_langs=DEFAULT_LANGS, backend='eager', greedy=False):
+        self.supported_langs = dict(catalog)
+        self.default_langs = list(default_langs)
+        self.backend = backend
+        self.registry = ModelRegistry(self.supported_langs, rss_budget_mb,
+                                      functools.partial(load_marian, backend=backend))
+        self.generation_kwargs = dict(GENERATION_KWARGS, **(GREEDY_KWARGS if greedy else {}))
+        # int8 and compiled outputs can differ slightly from eager, so they are cached separately
+        self.cache_settings = dict(self.generation_kwargs, backend=backend)
+        self.max_batch_size = max_batch_size
+        self.num_threads = self.threads_for(len(self.default_langs))
+        self.cache = None
+        if cache_path is not None:
+            self.cache = TranslationCache(cache_path, model_names=self.supported_langs.values())
+
+    @staticmethod
+    def threads_for(n_langs):
+        return max(1, (os.cpu_count() or 1) // max(n_langs, 1))
+
+    def preload(self, langs=None, on_error=None):
+        """Load langs (default: default_langs) now; failures go to on_error(lang, exc) or are raised."""
+        for lang in langs or self.default_langs:
+            try:
+                self.registry.get(lang)
+                print(f"Loaded {lang} model successfully.")
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(lang, e)
+
+    def loaded_langs(self):
+        return self.registry.ready_langs()
+
+    def translate_language(self, lang, words, on_batch=None, num_threads=None):
+        """One language's pipeline: cache lookup, then batched translation of the misses.
+
+        Returns a dict word -> translation (None on error). With on_batch, results
+        are passed on as they become ready, cache hits first, and the batches
+        ramp up from FIRST_BATCH_SIZE; otherwise full batches are used.
+        """
+        torch.set_num_threads(num_threads or self.num_threads)
+        model_name = self.supported_langs[lang]
+        translated = self.cache.get_many(model_name, words, self.cache_settings) if self.cache is not None else {}
+        if on_batch is not None and translated:
+            on_batch(translated)
+        missing = [word for word in words if word not in translated]
+        if missing:
+            def done(batch):
+                if self.cache is not None:
+                    self.cache.put_many(model_name, {w: t for w, t in batch.items() if t is not None},
+                                         self.cache_settings)
+                if on_batch is not None:
+                    on_batch(batch)
+
+            tokenizer, model = self.registry.get(lang)
+            first = FIRST_BATCH_SIZE if on_batch is not None else self.max_batch_size
+            translated.update(translate_words(tokenizer, model, missing, self.max_batch_size, done, first,
+                                              self.generation_kwargs))
+        return translated
+
+    def translate(self, words, langs=None, on_batch=None, on_error=None):
+        """Translate words into langs (default: default_langs) concurrently, loading models as needed.
+
+        Returns {lang: {word: translation}}; on_batch(lang, batch) streams results.
+        A language whose model fails to load or translate maps to None, and the
+        exception goes to on_error(lang, exc); the other languages are unaffected.
+        """
+        langs = list(langs or self.default_langs)
+        if not langs:
+            return {}
+        num_threads = self.threads_for(len(langs))
+        with ThreadPoolExecutor(max_workers=len(langs)) as pool:
+            futures = {lang: pool.submit(self.translate_language, lang, words,
+                                         None if on_batch is None else (lambda batch, lang=lang: on_batch(lang, batch)),
+                                         num_threads)
+                       for lang in langs}
+            results = {}
+            for lang, future in futures.items():
+                try:
+                    results[lang] = future.result()
+                except Exception as e:
+                    results[lang] = None
+                    if on_error is not None:
+                        on_error(lang, e)
+            return results
+
+    def stats(self):
+        return self.cache.stats() if self.cache is not None else {}
+
+    def model_stats(self):
+        return self.registry.stats()
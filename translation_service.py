@@ -0,0 +1,183 @@
+"""
+Local HTTP translation service on top of translation_engine with dynamic micro-batching.
+
+Requests arriving within --batch-window-ms of each other are merged into one
+batched generate per language, and each caller gets back its own words.
+
+    python translation_service.py [--port 8765] [--batch-window-ms 10] [--no-cache]
+
+    POST /translate  {"words": ["information", ...], "langs": ["French"]}
+                     -> {"translations": {"French": ["...", ...]}}   (null for failed words)
+                        plus {"errors": {lang: message}} for languages whose model failed
+    GET  /health     -> {"loaded": ["French", "Hindi"], "models": {per-model state, load time, memory, hit rate}}
+
+Models other than --preload are loaded on first use and evicted LRU under --rss-budget-mb.
+"""
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from minihttp import BodyTooLarge, json_response, read_request, wants_close
+from translation_engine import (BACKENDS, CACHE_PATH, DEFAULT_LANGS, MAX_BATCH_SIZE, RSS_BUDGET_MB,
+                                TranslationEngine)
+
+BATCH_WINDOW_MS = 10
+MAX_BODY_BYTES = 1 << 20
+
+
+class MicroBatcher:
+    """Collects one language's requests for a short window and translates them together.
+
+    Batches run on a dedicated single-thread executor, so a language never has
+    two generate calls competing for its share of the cores; requests arriving
+    while a batch runs are collected into the next one.
+    """
+
+    def __init__(self, engine, lang, window_ms=BATCH_WINDOW_MS, max_words=MAX_BATCH_SIZE):
+        self.engine = engine
+        self.lang = lang
+        self.window = window_ms / 1000
+        self.max_words = max_words
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"translate-{lang}")
+        self.pending = []
+        self.pending_words = 0
+        self.full = asyncio.Event()
+        self.flusher = None
+        self.batches = self.requests = 0
+
+    async def translate(self, words):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((words, future))
+        self.pending_words += len(words)
+        self.requests += 1
+        if self.pending_words >= self.max_words:
+            self.full.set()
+        if self.flusher is None:
+            self.flusher = asyncio.ensure_future(self.flush())
+        return await future
+
+    async def flush(self):
+        try:
+            await asyncio.wait_for(self.full.wait(), self.window)
+        except asyncio.TimeoutError:
+            pass
+        batch, self.pending, self.pending_words = self.pending, [], 0
+        self.full.clear()
+        self.flusher = None
+        self.batches += 1
+        words = list(dict.fromkeys(word for request, _ in batch for word in request))
+        try:
+            translated = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.engine.translate_language, self.lang, words)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for request, future in batch:
+            if not future.done():
+                future.set_result([translated.get(word) for word in request])
+
+
+class TranslationService:
+    def __init__(self, engine, window_ms=BATCH_WINDOW_MS):
+        self.engine = engine
+        self.window_ms = window_ms
+        self.batchers = {}
+
+    def batcher(self, lang):
+        if lang not in self.batchers:
+            self.batchers[lang] = MicroBatcher(self.engine, lang, self.window_ms, self.engine.max_batch_size)
+        return self.batchers[lang]
+
+    async def handle_translate(self, payload):
+        words = payload.get("words")
+        if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+            return 400, {"error": "'words' must be a list of strings"}
+        langs = payload.get("langs") or self.engine.default_langs
+        if not isinstance(langs, list) or not all(isinstance(lang, str) for lang in langs):
+            return 400, {"error": "'langs' must be a list of strings"}
+        unknown = [lang for lang in langs if lang not in self.engine.supported_langs]
+        if unknown:
+            return 400, {"error": f"unsupported languages: {', '.join(unknown)}"}
+        results = await asyncio.gather(*(self.batcher(lang).translate(words) for lang in langs),
+                                       return_exceptions=True)
+        # a language whose model failed gets nulls and an entry in "errors"; the others are still returned
+        errors = {lang: f"{type(r).__name__}: {r}" for lang, r in zip(langs, results) if isinstance(r, Exception)}
+        translations = {lang: [None] * len(words) if lang in errors else r for lang, r in zip(langs, results)}
+        return 200, dict({"translations": translations}, **({"errors": errors} if errors else {}))
+
+    def stats(self):
+        return {lang: {"requests": b.requests, "batches": b.batches} for lang, b in self.batchers.items()}
+
+    async def handle_connection(self, reader, writer):
+        """Minimal HTTP/1.1 with keep-alive: enough for the GUI-free clients and the load test."""
+        try:
+            while True:
+                try:
+                    request = await read_request(reader, MAX_BODY_BYTES)
+                except BodyTooLarge:
+                    writer.write(json_response(413, {"error": "request body too large"}, close=True))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self.route(method, path, body)
+                close = wants_close(headers)
+                writer.write(json_response(status, payload, close))
+                await writer.drain()
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        if method == "GET" and path == "/health":
+            return 200, {"loaded": self.engine.loaded_langs(), "models": self.engine.model_stats(),
+                         "batching": self.stats(), "cache": self.engine.stats()}
+        if method == "POST" and path == "/translate":
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                return 400, {"error": "invalid JSON"}
+            try:
+                return await self.handle_translate(payload)
+            except Exception as e:
+                return 500, {"error": str(e)}
+        return 404, {"error": f"no route for {method} {path}"}
+
+
+async def serve(engine, host, port, window_ms):
+    service = TranslationService(engine, window_ms)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Serving {len(engine.supported_langs)} languages ({', '.join(engine.loaded_langs())} loaded) "
+          f"on http://{host}:{port} (batch window {window_ms} ms, max batch {engine.max_batch_size} words)")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW_MS)
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--rss-budget-mb", type=float, default=RSS_BUDGET_MB)
+    parser.add_argument("--preload", nargs="*", default=DEFAULT_LANGS, help="languages to load at startup")
+    parser.add_argument("--backend", choices=BACKENDS, default="eager")
+    parser.add_argument("--greedy", action="store_true", help="greedy decoding (num_beams=1), the fast mode")
+    parser.add_argument("--no-cache", action="store_true", help="always run the model (e.g. for load testing)")
+    args = parser.parse_args()
+
+    engine = TranslationEngine(cache_path=None if args.no_cache else CACHE_PATH, max_batch_size=args.max_batch_size,
+                               rss_budget_mb=args.rss_budget_mb, backend=args.backend, greedy=args.greedy)
+    engine.preload(args.preload)
+    asyncio.run(serve(engine, args.host, args.port, args.batch_window_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Frame selection and threaded decoding for video OCR.
+
+Running the OCR reader on every Nth frame repeats the same work on static
+slides and misses captions that appear and disappear between two samples.
+FrameSampler compares a checked frame with the last OCR'd frame through a
+cheap NumPy thumbnail: a block-averaged grayscale grid, about 64 cells wide.
+It asks for OCR only when enough cells changed. Only every check_interval
+seconds is a frame checked, and none are checked within min_interval of the
+last OCR. max_interval re-samples content that changes too slowly to
+trigger.
+
+ocr_video() decodes on its own thread. Frames that won't be checked are only
+grab()bed, so they are never retrieved and colour-converted. Sampled frames
+pass through a bounded queue to OCR workers, so decoding overlaps
+recognition and at most queue_size frames are held in memory:
+
+    results, stats = ocr_video(path, lambda frame: reader.readtext(frame), workers=2)
+    for index, result in results: ...
+
+TextTracker merges the detections of consecutive OCR'd frames into tracks by
+normalized text and bbox overlap. A caption on screen for ten seconds then
+becomes one track with a frame range rather than ten copies to translate:
+
+    tracker = TextTracker()
+    _, stats = ocr_video(path, readtext, on_frame=tracker.update, collect=False)
+    for track in tracker.tracks(stats["fps"]): ...
+"""
+import queue
+import re
+import threading
+import time
+
+import cv2
+import numpy as np
+
+GRID_WIDTH = 64
+PIXEL_THRESHOLD = 12.0  # grey levels a cell must move to count as changed
+CHANGE_THRESHOLD = 0.004  # share of cells that must change to trigger OCR
+CHECK_INTERVAL = 0.1  # seconds
+MIN_INTERVAL = 0.2
+MAX_INTERVAL = 5.0
+QUEUE_SIZE = 4
+MIN_IOU = 0.3  # bbox overlap for two detections of the same text to be one track
+MAX_MISSED = 1  # OCR'd frames a track may be missing from (a flickering detection) before it ends
+_STOP = object()
+
+
+def thumbnail(frame, grid_width=GRID_WIDTH):
+    """Block-averaged grayscale grid of a BGR or grayscale frame (float32, 0-255)."""
+    frame = frame[::2, ::2]  # halve the work first; text strokes survive the block average
+    height, width = frame.shape[:2]
+    cell = max(1, width // grid_width)
+    rows, cols = height // cell, width // cell
+    blocks = frame[:rows * cell, :cols * cell].reshape(rows, cell, cols, cell, -1)
+    return blocks.mean(axis=(1, 3, 4), dtype=np.float32)
+
+
+class FrameSampler:
+    def __init__(self, fps, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL, check_interval=CHECK_INTERVAL,
+                 change_threshold=CHANGE_THRESHOLD, pixel_threshold=PIXEL_THRESHOLD, grid_width=GRID_WIDTH):
+        fps = fps if fps and fps > 0 else 30.0
+        self.check_frames = max(1, round(check_interval * fps))
+        self.min_frames = max(1, round(min_interval * fps))
+        self.max_frames = max(self.min_frames, round(max_interval * fps))
+        self.change_threshold = change_threshold
+        self.pixel_threshold = pixel_threshold
+        self.grid_width = grid_width
+        self.reference = None  # thumbnail of the last frame sent to OCR
+        self.last_index = None
+        self.frames = self.checked = self.ocr_calls = self.changed = 0
+
+    def wants(self, index):
+        """Whether frame `index` is worth retrieving at all; the others only need grab()."""
+        self.frames += 1
+        if self.last_index is None:
+            return True
+        since = index - self.last_index
+        return since >= self.max_frames or (since >= self.min_frames and index % self.check_frames == 0)
+
+    def change(self, frame):
+        """Share of thumbnail cells that differ from the last OCR'd frame (1.0 before the first)."""
+        small = thumbnail(frame, self.grid_width)
+        if self.reference is None or small.shape != self.reference.shape:
+            return 1.0, small
+        return float(np.mean(np.abs(small - self.reference) > self.pixel_threshold)), small
+
+    def should_ocr(self, index, frame):
+        self.checked += 1
+        since = None if self.last_index is None else index - self.last_index
+        if since is not None and since < self.min_frames:
+            return False
+        change, small = self.change(frame)
+        if since is not None and change < self.change_threshold and since < self.max_frames:
+            return False
+        self.changed += change >= self.change_threshold
+        self.reference = small
+        self.last_index = index
+        self.ocr_calls += 1
+        return True
+
+    def stats(self):
+        return {"frames": self.frames, "checked": self.checked, "ocr_calls": self.ocr_calls,
+                "on_change": self.changed, "on_max_interval": self.ocr_calls - self.changed}
+
+
+def sampled_frames(cap, sampler):
+    """(index, frame) of the frames the sampler picks for OCR; the rest are grab()bed, never retrieved."""
+    index = 0
+    while cap.grab():
+        if sampler.wants(index):
+            ret, frame = cap.retrieve()
+            if ret and sampler.should_ocr(index, frame):
+                yield index, frame
+        index += 1
+
+
+def ocr_video(path, readtext, sampler=None, workers=1, queue_size=QUEUE_SIZE, on_frame=None, collect=True):
+    """
+    OCR the sampled frames of a video with a decoder thread and `workers` OCR threads.
+
+    readtext(frame) is called on the worker threads. on_frame(index, result) is
+    called in frame order, one call at a time. Returns ([(index, result), ...]
+    in frame order, or [] without collect, stats). Raises IOError when the
+    video cannot be opened and re-raises the first readtext error.
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"could not open video {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    sampler = sampler or FrameSampler(fps)
+    frames = queue.Queue(queue_size)
+    stop = threading.Event()
+    results, errors = [], []
+    done, next_seq = {}, [0]  # finished frames waiting for an earlier one, by decode order
+    timings = {"decode_seconds": 0.0, "ocr_seconds": 0.0}
+    lock = threading.Lock()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def decode():
+        start = time.perf_counter()
+        try:
+            for seq, item in enumerate(sampled_frames(cap, sampler)):
+                if not put((seq,) + item):
+                    break
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            cap.release()
+            timings["decode_seconds"] = time.perf_counter() - start
+            for _ in range(workers):
+                put(_STOP)
+
+    def recognize():
+        while not stop.is_set():
+            try:
+                item = frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _STOP:
+                return
+            seq, index, frame = item
+            start = time.perf_counter()
+            try:
+                result = readtext(frame)
+                with lock:
+                    timings["ocr_seconds"] += time.perf_counter() - start
+                    done[seq] = (index, result)
+                    while next_seq[0] in done:
+                        ready = done.pop(next_seq[0])
+                        next_seq[0] += 1
+                        if on_frame:
+                            on_frame(*ready)
+                        if collect:
+                            results.append(ready)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+                return
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=decode, name="video-decode", daemon=True)]
+    threads += [threading.Thread(target=recognize, name=f"video-ocr-{i}", daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    stats = dict(sampler.stats(), fps=fps, wall_seconds=time.perf_counter() - start, **timings)
+    return results, stats
+
+
+def normalize_text(text):
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def bbox_rect(bbox):
+    """(x0, y0, x1, y1) of an EasyOCR four-point bbox."""
+    xs = [point[0] for point in bbox]
+    ys = [point[1] for point in bbox]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def iou(a, b):
+    x0, y0, x1, y1 = max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, x1 - x0) * max(0, y1 - y0)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+class TextTracker:
+    """Merges per-frame detections into tracks; update() must be called in frame order."""
+
+    def __init__(self, min_iou=MIN_IOU, max_missed=MAX_MISSED):
+        self.min_iou = min_iou
+        self.max_missed = max_missed
+        self.active, self.closed = [], []
+        self.detections = 0
+
+    def update(self, index, detections):
+        """detections: (bbox, text, confidence) of one OCR'd frame."""
+        matched = set()
+        for bbox, text, confidence in detections:
+            key = normalize_text(text)
+            if not key:
+                continue
+            self.detections += 1
+            rect = bbox_rect(bbox)
+            candidates = [(iou(rect, track["rect"]), i) for i, track in enumerate(self.active)
+                          if track["key"] == key and i not in matched]
+            overlap, best = max(candidates, default=(0.0, None))
+            if best is None or overlap < self.min_iou:
+                self.active.append({"key": key, "text": text.strip(), "confidence": confidence, "bbox": bbox,
+                                    "rect": rect, "first_frame": index, "last_frame": index, "frames": 1,
+                                    "missed": 0})
+                matched.add(len(self.active) - 1)
+                continue
+            track = self.active[best]
+            matched.add(best)
+            if confidence > track["confidence"]:
+                track.update(text=text.strip(), confidence=confidence)
+            track.update(bbox=bbox, rect=rect, last_frame=index, missed=0)
+            track["frames"] += 1
+        still_active = []
+        for i, track in enumerate(self.active):
+            if i not in matched:
+                track["missed"] += 1
+            (still_active if track["missed"] <= self.max_missed else self.closed).append(track)
+        self.active = still_active
+
+    def tracks(self, fps=30.0):
+        """Every track so far, by first appearance, with start/end times in seconds."""
+        tracks = sorted(self.closed + self.active, key=lambda track: (track["first_frame"], track["rect"][1]))
+        return [{"text": track["text"], "confidence": track["confidence"], "bbox": track["bbox"],
+                 "first_frame": track["first_frame"], "last_frame": track["last_frame"],
+                 "start": track["first_frame"] / fps, "end": track["last_frame"] / fps,
+                 "frames": track["frames"]} for track in tracks]
+
+    def stats(self):
+        return {"detections": self.detections, "tracks": len(self.closed) + len(self.active)}
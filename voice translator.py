@@ -1,63 +1,110 @@
 import tkinter as tk
 from tkinter import messagebox
-import speech_recognition as sr
-from googletrans import Translator
 from datetime import datetime
+from voice_pipeline import VoicePipeline, MicrophoneSource, GoogleRecognizer, ClientTranslator
 
-recognizer = sr.Recognizer()
-translator = Translator()
+pipeline = None
 
 START_TIME = "14:30"
 END_TIME = "22:00"
+CHECK_WINDOW_MS = 1000
 
 def is_time_allowed():
     current_time = datetime.now().strftime("%H:%M")
     return START_TIME <= current_time <= END_TIME
 
+def show_status(status):
+    root.after(0, output_text.set, status)
+
+def show_result(result):
+    if result.error:
+        line = f"❌ Error: {result.error}"
+    elif result.text is None:
+        line = "⚠️ Didn't catch that. Please repeat clearly."
+    else:
+        print("Recognized English:", result.text)
+        line = f"🗣 Hindi: {result.translation}"
+    root.after(0, append_result, line)
+
+def append_result(line):
+    output_text.set(line)
+    results_box.insert(tk.END, line + "\n")
+    results_box.see(tk.END)
+
 def translate_audio():
+    """Start or stop continuous listening; capture, recognition and translation run off the Tk thread."""
+    global pipeline
+    if pipeline is not None:
+        stop_listening("⏳ Finishing the last phrases...")
+        return
+
     if not is_time_allowed():
         output_text.set("🌙 Taking rest, see you tomorrow!")
         return
 
+    def started():
+        root.after(0, listening_started, current)
+
+    def finished(error):
+        root.after(0, listening_finished, current, error)
+
     try:
-        with sr.Microphone() as source:
-            output_text.set("🎧 Listening... Speak now!")
-            root.update()
-            audio_data = recognizer.listen(source, timeout=5)
-            output_text.set("🛠 Processing audio...")
-            root.update()
-
-            text = recognizer.recognize_google(audio_data, language="en-IN")
-            print("Recognized English:", text)
-
-            translated = translator.translate(text, src='en', dest='hi')
-            output_text.set(f"🗣 Hindi: {translated.text}")
-
-    except sr.UnknownValueError:
-        output_text.set("⚠️ Didn't catch that. Please repeat clearly.")
-    except sr.RequestError:
-        output_text.set("🚫 Error connecting to speech service.")
+        current = VoicePipeline(MicrophoneSource(), GoogleRecognizer(language="en-IN"),
+                                ClientTranslator(src='en', dest='hi'), show_result, show_status,
+                                on_started=started, on_finished=finished)
+        pipeline = current.start()
+        translate_button.config(text="Starting...")
     except Exception as e:
+        pipeline = None
+        translate_button.config(text="Start Listening")
         output_text.set(f"❌ Error: {str(e)}")
 
+def stop_listening(message):
+    global pipeline
+    pipeline.stop()
+    pipeline = None
+    translate_button.config(text="Start Listening")
+    output_text.set(message)
+
+def listening_started(started_pipeline):
+    # the label only changes once the microphone is open
+    if started_pipeline is pipeline:
+        translate_button.config(text="Stop Listening")
+        root.after(CHECK_WINDOW_MS, check_time_window, started_pipeline)
+
+def listening_finished(finished_pipeline, error):
+    global pipeline
+    if finished_pipeline is pipeline:  # e.g. the microphone failed to open
+        pipeline = None
+        translate_button.config(text="Start Listening")
+
+def check_time_window(checked_pipeline):
+    """Stop continuous listening once the allowed time window closes."""
+    if checked_pipeline is not pipeline:
+        return
+    if not is_time_allowed():
+        stop_listening("🌙 Taking rest, see you tomorrow!")
+        return
+    root.after(CHECK_WINDOW_MS, check_time_window, checked_pipeline)
+
 root = tk.Tk()
 root.title("🎤 Voice Translator (English ➝ Hindi)")
-root.geometry("500x300")
+root.geometry("500x400")
 root.resizable(False, False)
 
-canvas = tk.Canvas(root, width=500, height=300)
+canvas = tk.Canvas(root, width=500, height=400)
 canvas.pack(fill="both", expand=True)
 
-for i in range(300):
-    r = int(240 - (i / 300) * 40)
-    g = int(240 - (i / 300) * 80)
-    b = int(255 - (i / 300) * 60)
+for i in range(400):
+    r = int(240 - (i / 400) * 40)
+    g = int(240 - (i / 400) * 80)
+    b = int(255 - (i / 400) * 60)
     color = f'#{r:02x}{g:02x}{b:02x}'
     canvas.create_line(0, i, 500, i, fill=color)
 
 
 frame = tk.Frame(root, bg="#ffffff", bd=2, relief="flat")
-frame.place(relx=0.5, rely=0.5, anchor="center", width=400, height=220)
+frame.place(relx=0.5, rely=0.5, anchor="center", width=400, height=340)
 
 title_label = tk.Label(frame, text="🎤 English ➝ Hindi Translator", font=("Helvetica", 16, "bold"), bg="#ffffff", fg="#333333")
 title_label.pack(pady=15)
@@ -81,4 +128,7 @@ output_label = tk.Label(frame, textvariable=output_text, font=("Helvetica", 13),
                         padx=10, pady=10, relief="solid", bd=1)
 output_label.pack(pady=15, fill="x", padx=10)
 
+results_box = tk.Text(frame, height=5, font=("Helvetica", 11), bg="#fafafa", fg="#333333", relief="solid", bd=1)
+results_box.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
 root.mainloop()
@@ -0,0 +1,203 @@
+"""
+Batch transcription + translation of a directory of recorded audio (WAV/FLAC).
+
+Each file is streamed through speech_recognition's AudioFile and split on
+silence (voice_pipeline.segment_phrases). Each chunk goes to a process pool as
+soon as it is found, to be recognized and translated with one recognizer and
+translator per worker. Reading blocks while 4 x workers chunks are in flight. Each finished file
+is appended to the output JSONL as one line with per-segment timestamps. Files
+already in the output are skipped, so an interrupted run resumes where it stopped;
+a file with any failed segment is recorded with "complete": false and redone.
+
+Recognizers and translators are pluggable: the built-in names below, or any
+"module:Class" whose instances have recognize(phrase) / translate(text). The
+default is Google recognition and the shared translation client. The offline
+stand-ins (made-up transcripts, tagged translations) are for benchmarks only:
+
+    python voice_batch.py calls/ results.jsonl --dest hi
+    python voice_batch.py calls/ results.jsonl --recognizer scripted --translator stand-in --workers 4
+"""
+import argparse
+import importlib
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from jsonl_resume import done_files
+from voice_pipeline import Phrase, segment_phrases
+
+AUDIO_EXTENSIONS = (".wav", ".flac")
+FRAME_MS = 30
+RECOGNIZERS = {"google": "voice_pipeline:GoogleRecognizer", "scripted": "voice_pipeline:ScriptedRecognizer"}
+TRANSLATORS = {"client": "voice_pipeline:ClientTranslator", "marian": "voice_pipeline:MarianTranslator",
+               "stand-in": "voice_pipeline:StandInTranslator"}
+
+_worker = {}
+
+
+def load_plugin(spec, builtins, **kwargs):
+    module_name, _, class_name = builtins.get(spec, spec).partition(":")
+    return getattr(importlib.import_module(module_name), class_name)(**kwargs)
+
+
+def _init_worker(recognizer, recognizer_kwargs, translator, translator_kwargs, threads):
+    try:
+        import torch
+        torch.set_num_threads(threads)  # workers x threads should not exceed the cores (marian translator)
+    except ImportError:
+        pass
+    _worker["recognizer"] = load_plugin(recognizer, RECOGNIZERS, **recognizer_kwargs)
+    _worker["translator"] = load_plugin(translator, TRANSLATORS, **translator_kwargs)
+
+
+def _process(phrase):
+    segment = {"start": round(phrase.start, 3), "end": round(phrase.end, 3), "text": None, "translation": None,
+               "error": None}
+    try:
+        segment["text"] = _worker["recognizer"].recognize(phrase)
+        if segment["text"]:
+            segment["translation"] = _worker["translator"].translate(segment["text"])
+    except Exception as e:
+        segment["error"] = f"{type(e).__name__}: {e}"
+    return segment
+
+
+def find_audio(root):
+    for directory, _, names in sorted(os.walk(root)):
+        for name in sorted(names):
+            if name.lower().endswith(AUDIO_EXTENSIONS):
+                yield os.path.join(directory, name)
+
+
+def stream_phrases(path, threshold, min_silence, max_phrase, info):
+    """Phrases of one audio file as they are found, read through speech_recognition.AudioFile a frame at a time.
+
+    info["duration"] is set to the audio length in seconds once the file is exhausted.
+    (speech_recognition decodes FLAC to an in-memory AIFF first; WAV is read incrementally.)
+    """
+    import speech_recognition as sr
+    with sr.AudioFile(path) as source:
+        rate, width = source.SAMPLE_RATE, source.SAMPLE_WIDTH
+        frame_len = rate * FRAME_MS // 1000
+        n_samples = 0
+
+        def frames():
+            nonlocal n_samples
+            while True:
+                data = source.stream.read(frame_len)
+                if not data:
+                    return
+                pcm = sr.AudioData(data, rate, width).get_raw_data(convert_width=2)
+                mono = np.frombuffer(pcm, dtype="<i2")
+                n_samples += len(mono)
+                yield mono
+
+        for index, (pcm, start, end) in enumerate(segment_phrases(frames(), rate, threshold, min_silence,
+                                                                  max_phrase=max_phrase)):
+            yield Phrase(index, pcm, rate, 2, start, end)
+    info["duration"] = n_samples / rate
+
+
+def transcribe_directory(root, out_path, recognizer="google", translator="client", workers=None,
+                         language="en-IN", src="en", dest="hi", threshold=0.02, min_silence=0.5, max_phrase=15.0,
+                         stand_in_delay=0.0):
+    workers = workers or os.cpu_count() or 1
+    done = done_files(out_path)
+    files = [path for path in find_audio(root) if os.path.relpath(path, root) not in done]
+    print(f"{len(files)} files to process ({len(done)} already done), {workers} workers")
+    recognizer_kwargs = {"google": {"language": language},
+                         "scripted": {"delay": stand_in_delay}}.get(recognizer, {})
+    translator_kwargs = {"client": {"src": src, "dest": dest},
+                         "stand-in": {"delay": stand_in_delay, "tag": dest}}.get(translator, {})
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    max_pending = 4 * workers  # chunks in flight; with streamed reading this bounds memory on long files too
+
+    start = time.perf_counter()
+    audio_seconds = 0.0
+    initargs = (recognizer, recognizer_kwargs, translator, translator_kwargs, threads)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as pool, \
+            open(out_path, "a", encoding="utf-8") as out:
+        pending = deque()  # (path, duration, futures, read seconds) of fully read files, in order
+        in_flight = set()
+
+        def finish(path, duration, futures, read_seconds):
+            nonlocal audio_seconds
+            segments = [future.result() for future in futures]
+            audio_seconds += duration
+            failed = sum(segment["error"] is not None for segment in segments)
+            record = {"file": os.path.relpath(path, root), "duration": round(duration, 3),
+                      "segments": segments, "read_seconds": round(read_seconds, 3), "complete": not failed}
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            elapsed = time.perf_counter() - start
+            note = f" ({failed} failed, redone on the next run)" if failed else ""
+            print(f"{record['file']}: {len(segments)} segments{note}, {duration:.1f}s audio "
+                  f"({audio_seconds / elapsed:.1f} audio-s per wall-s so far)")
+
+        def submit(phrase):
+            # block while max_pending chunks are in flight, writing out files as they complete
+            while len(in_flight) >= max_pending:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                in_flight.difference_update(done)
+                while pending and all(future.done() for future in pending[0][2]):
+                    finish(*pending.popleft())
+            future = pool.submit(_process, phrase)
+            in_flight.add(future)
+            return future
+
+        for path in files:
+            futures, info, read_seconds = [], {}, 0.0
+            phrases = stream_phrases(path, threshold, min_silence, max_phrase, info)
+            try:
+                while True:
+                    read_start = time.perf_counter()
+                    phrase = next(phrases, None)
+                    read_seconds += time.perf_counter() - read_start
+                    if phrase is None:
+                        break
+                    futures.append(submit(phrase))
+            except Exception as e:
+                for future in futures:
+                    future.cancel()
+                in_flight.difference_update(futures)
+                print(f"{path}: skipped, {type(e).__name__}: {e}")
+                continue
+            pending.append((path, info["duration"], futures, read_seconds))
+            while pending and all(future.done() for future in pending[0][2]):
+                finish(*pending.popleft())
+        while pending:
+            finish(*pending.popleft())
+
+    elapsed = time.perf_counter() - start
+    print(f"Done: {audio_seconds:.1f}s of audio in {elapsed:.1f}s wall "
+          f"({audio_seconds / max(elapsed, 1e-9):.1f} audio-s per wall-s) -> {out_path}")
+    return audio_seconds, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="directory of .wav/.flac files (searched recursively)")
+    parser.add_argument("out", help="JSONL output; files already in it are skipped")
+    parser.add_argument("--recognizer", default="google",
+                        help=f"{', '.join(RECOGNIZERS)} or module:Class (scripted is an offline stand-in)")
+    parser.add_argument("--translator", default="client",
+                        help=f"{', '.join(TRANSLATORS)} or module:Class (stand-in is an offline stand-in)")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--language", default="en-IN", help="recognition language (google)")
+    parser.add_argument("--src", default="en")
+    parser.add_argument("--dest", default="hi")
+    parser.add_argument("--threshold", type=float, default=0.02, help="RMS level counted as speech")
+    parser.add_argument("--min-silence", type=float, default=0.5, help="seconds of silence that end a phrase")
+    parser.add_argument("--max-phrase", type=float, default=15.0, help="longest chunk sent to the recognizer")
+    parser.add_argument("--stand-in-delay", type=float, default=0.0, help="simulated latency of the stand-ins (s)")
+    args = parser.parse_args()
+    transcribe_directory(args.root, args.out, args.recognizer, args.translator, args.workers, args.language,
+                         args.src, args.dest, args.threshold, args.min_silence, args.max_phrase, args.stand_in_delay)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+Continuous capture -> recognize -> translate pipeline for the voice translator.
+
+Capture runs on its own thread and cuts the audio into phrases. Recognition
+and translation each run on a worker thread fed by a bounded queue, so phrase
+n is being translated while phrase n+1 is recognized and phrase n+2 is still
+being spoken. Sources, recognizers and translators are small pluggable classes.
+The offline stand-ins (WavFileSource, ScriptedRecognizer, StandInTranslator)
+let the pipeline run without a microphone or network:
+
+    python voice_pipeline.py --wav speech.wav [--transcripts speech.txt] [--translator marian]
+"""
+import argparse
+import queue
+import threading
+import time
+import wave
+from collections import namedtuple
+
+import numpy as np
+
+# pcm: raw little-endian samples; start/end: seconds since capture started
+Phrase = namedtuple("Phrase", "index pcm sample_rate sample_width start end")
+# text is None when nothing intelligible was recognized; error is a message or None
+PhraseResult = namedtuple("PhraseResult", "index start end text translation error latency")
+
+QUEUE_SIZE = 8
+_STOP = object()
+
+
+def phrase_to_audio_data(phrase):
+    import speech_recognition as sr
+    return sr.AudioData(phrase.pcm, phrase.sample_rate, phrase.sample_width)
+
+
+class MicrophoneSource:
+    """Live microphone phrases, segmented by speech_recognition's pause detection."""
+
+    def __init__(self, recognizer=None, pause_threshold=0.6, phrase_time_limit=15):
+        import speech_recognition as sr
+        self.recognizer = recognizer or sr.Recognizer()
+        self.recognizer.pause_threshold = pause_threshold
+        self.phrase_time_limit = phrase_time_limit
+
+    def phrases(self, stop, on_open=None):
+        import speech_recognition as sr
+        with sr.Microphone() as source:
+            self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+            if on_open is not None:
+                on_open()
+            started = time.monotonic()
+            index = 0
+            while not stop.is_set():
+                try:
+                    audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=self.phrase_time_limit)
+                except sr.WaitTimeoutError:
+                    continue
+                end = time.monotonic() - started
+                pcm = audio.get_raw_data()
+                duration = len(pcm) / (audio.sample_rate * audio.sample_width)
+                yield Phrase(index, pcm, audio.sample_rate, audio.sample_width, max(end - duration, 0.0), end)
+                index += 1
+
+
+def segment_phrases(frames, rate, threshold=0.02, min_silence=0.5, min_phrase=0.2, max_phrase=15.0):
+    """Split a stream of mono int16 frames on silence by RMS energy.
+
+    Yields (pcm bytes, start, end) in seconds as soon as each phrase ends: after
+    min_silence of quiet, or at max_phrase. Phrases with less than min_phrase of
+    sound are dropped.
+    """
+    current, silent, length, t = [], 0.0, 0.0, 0.0
+    for mono in frames:
+        frame_seconds = len(mono) / rate
+        t += frame_seconds
+        loud = np.sqrt(np.mean((mono / 32768.0) ** 2)) >= threshold
+        if loud or current:
+            current.append(mono.tobytes())
+            length += frame_seconds
+            silent = 0.0 if loud else silent + frame_seconds
+        if current and (silent >= min_silence or length >= max_phrase):
+            if length - silent >= min_phrase:
+                yield b"".join(current), t - length, t
+            current, silent, length = [], 0.0, 0.0
+    if current and length - silent >= min_phrase:
+        yield b"".join(current), t - length, t
+
+
+class WavFileSource:
+    """Phrases from a recorded WAV file, split on silence by frame RMS energy.
+
+    With realtime=True the file is read at playback speed, like a microphone,
+    so the overlap between capture and the workers is the same as live.
+    """
+
+    def __init__(self, path, threshold=0.02, min_silence=0.5, min_phrase=0.2, max_phrase=15.0,
+                 frame_ms=30, realtime=False):
+        self.path = path
+        self.threshold = threshold
+        self.min_silence = min_silence
+        self.min_phrase = min_phrase
+        self.max_phrase = max_phrase
+        self.frame_ms = frame_ms
+        self.realtime = realtime
+
+    def _frames(self, wav, stop):
+        rate, channels = wav.getframerate(), wav.getnchannels()
+        frame_len = rate * self.frame_ms // 1000
+        started, t = time.monotonic(), 0.0
+        while not stop.is_set():
+            data = wav.readframes(frame_len)
+            if not data:
+                return
+            samples = np.frombuffer(data, dtype="<i2").reshape(-1, channels)
+            mono = samples.mean(axis=1).astype("<i2") if channels > 1 else samples[:, 0]
+            t += len(mono) / rate
+            if self.realtime:
+                time.sleep(max(t - (time.monotonic() - started), 0.0))
+            yield mono
+
+    def phrases(self, stop, on_open=None):
+        with wave.open(self.path, "rb") as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"{self.path}: only 16-bit PCM WAV is supported")
+            if on_open is not None:
+                on_open()
+            rate = wav.getframerate()
+            segments = segment_phrases(self._frames(wav, stop), rate, self.threshold, self.min_silence,
+                                       self.min_phrase, self.max_phrase)
+            for index, (pcm, start, end) in enumerate(segments):
+                yield Phrase(index, pcm, rate, 2, start, end)
+
+
+class GoogleRecognizer:
+    def __init__(self, language="en-IN"):
+        import speech_recognition as sr
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+        self.language = language
+
+    def recognize(self, phrase):
+        try:
+            return self.recognizer.recognize_google(phrase_to_audio_data(phrase), language=self.language)
+        except self.sr.UnknownValueError:
+            return None
+        except self.sr.RequestError:
+            raise ConnectionError("Error connecting to speech service.")
+
+
+class ScriptedRecognizer:
+    """Offline stand-in: returns the given transcripts in order, with optional simulated latency."""
+
+    def __init__(self, transcripts=None, delay=0.0):
+        self.transcripts = list(transcripts or [])
+        self.delay = delay
+
+    def recognize(self, phrase):
+        time.sleep(self.delay)
+        if phrase.index < len(self.transcripts):
+            return self.transcripts[phrase.index]
+        return f"phrase {phrase.index + 1} ({phrase.end - phrase.start:.1f}s)"
+
+
+class ClientTranslator:
+    """Translation through the shared translation_client (googletrans, or TRANSLATION_API_URL)."""
+
+    def __init__(self, src="en", dest="hi", client=None):
+        from translation_client import get_client
+        self.client = client or get_client()
+        self.src = src
+        self.dest = dest
+
+    def translate(self, text):
+        return self.client.translate(text, src=self.src, dest=self.dest)
+
+
+class MarianTranslator:
+    """Local MarianMT translation through translation_engine (no network after the first download)."""
+
+    def __init__(self, lang="Hindi", engine=None):
+        from translation_engine import TranslationEngine
+        self.engine = engine or TranslationEngine(default_langs=[lang])
+        self.lang = lang
+
+    def translate(self, text):
+        translated = self.engine.translate_language(self.lang, [text])[text]
+        if translated is None:
+            raise RuntimeError(f"{self.lang} translation failed")
+        return translated
+
+
+class StandInTranslator:
+    """Offline stand-in: tags the text instead of translating it, with optional simulated latency."""
+
+    def __init__(self, delay=0.0, tag="hi"):
+        self.delay = delay
+        self.tag = tag
+
+    def translate(self, text):
+        time.sleep(self.delay)
+        return f"[{self.tag}] {text}"
+
+
+class VoicePipeline:
+    """Runs source -> recognizer -> translator on three threads and reports each phrase.
+
+    on_result(PhraseResult) and on_status(str) are called from worker threads;
+    a GUI should hand them to its main loop (e.g. with root.after). So are
+    on_started(), once the source is open (e.g. the microphone), and
+    on_finished(error), after the last phrase, with the capture error or None.
+    """
+
+    def __init__(self, source, recognizer, translator, on_result, on_status=None, queue_size=QUEUE_SIZE,
+                 on_started=None, on_finished=None):
+        self.source = source
+        self.recognizer = recognizer
+        self.translator = translator
+        self.on_result = on_result
+        self.on_status = on_status or (lambda status: None)
+        self.on_started = on_started or (lambda: None)
+        self.on_finished = on_finished or (lambda error: None)
+        self.capture_error = None
+        self.stop_event = threading.Event()
+        self.to_recognize = queue.Queue(queue_size)
+        self.to_translate = queue.Queue(queue_size)
+        self.threads = []
+
+    def start(self):
+        self.threads = [threading.Thread(target=target, daemon=True)
+                        for target in (self._capture, self._recognize, self._translate)]
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """Stop capturing; phrases already captured are still recognized and translated."""
+        self.stop_event.set()
+
+    def join(self, timeout=None):
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def _put(self, q, item):
+        while True:
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if self.stop_event.is_set() and item is not _STOP:
+                    return False
+
+    def _opened(self):
+        self.on_status("🎧 Listening... Speak now!")
+        self.on_started()
+
+    def _capture(self):
+        try:
+            for phrase in self.source.phrases(self.stop_event, on_open=self._opened):
+                if not self._put(self.to_recognize, (phrase, time.monotonic())):
+                    break
+        except Exception as e:
+            self.capture_error = e
+            self.on_status(f"❌ Error: {e}")
+        finally:
+            self._put(self.to_recognize, _STOP)
+
+    def _recognize(self):
+        while True:
+            item = self.to_recognize.get()
+            if item is _STOP:
+                self._put(self.to_translate, _STOP)
+                return
+            phrase, captured = item
+            try:
+                text, error = self.recognizer.recognize(phrase), None
+            except Exception as e:
+                text, error = None, str(e)
+            # unrecognized phrases go through the translate queue too, so results stay in order
+            self._put(self.to_translate, (phrase, captured, text, error))
+
+    def _translate(self):
+        while True:
+            item = self.to_translate.get()
+            if item is _STOP:
+                if self.capture_error is None:
+                    self.on_status("⏹ Stopped.")
+                self.on_finished(self.capture_error)
+                return
+            phrase, captured, text, error = item
+            translation = None
+            if text is not None and error is None:
+                try:
+                    translation = self.translator.translate(text)
+                except Exception as e:
+                    error = str(e)
+            self.on_result(PhraseResult(phrase.index, phrase.start, phrase.end, text, translation, error,
+                                        time.monotonic() - captured))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wav", help="16-bit PCM WAV input (default: microphone)")
+    parser.add_argument("--realtime", action="store_true", help="read the WAV at playback speed")
+    parser.add_argument("--transcripts", help="text file, one line per phrase, for the scripted recognizer")
+    parser.add_argument("--recognizer", choices=["scripted", "google"])
+    parser.add_argument("--translator", choices=["stand-in", "marian", "client"], default="stand-in")
+    parser.add_argument("--delay", type=float, default=0.0, help="simulated latency of the stand-ins (s)")
+    args = parser.parse_args()
+
+    source = WavFileSource(args.wav, realtime=args.realtime) if args.wav else MicrophoneSource()
+    recognizer_name = args.recognizer or ("scripted" if args.wav else "google")
+    if recognizer_name == "scripted":
+        transcripts = None
+        if args.transcripts:
+            with open(args.transcripts, encoding="utf-8") as f:
+                transcripts = [line.strip() for line in f]
+        recognizer = ScriptedRecognizer(transcripts, args.delay)
+    else:
+        recognizer = GoogleRecognizer()
+    translator = {"stand-in": lambda: StandInTranslator(args.delay), "marian": MarianTranslator,
+                  "client": ClientTranslator}[args.translator]()
+
+    def on_result(r):
+        shown = r.translation if r.error is None else f"error: {r.error}"
+        print(f"[{r.start:6.1f}-{r.end:6.1f}s] {r.text!r} -> {shown!r} ({r.latency * 1000:.0f} ms after capture)")
+
+    pipeline = VoicePipeline(source, recognizer, translator, on_result, print).start()
+    try:
+        pipeline.join()
+    except KeyboardInterrupt:
+        pipeline.stop()
+        pipeline.join()
+
+
+if __name__ == "__main__":
+    main()